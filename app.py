@@ -1,11 +1,22 @@
 import os
-import time
 import json
+import re
 import subprocess
-import psutil
-from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify
+from datetime import datetime
+from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify, Response, stream_with_context
 from dotenv import load_dotenv
-from db_connector import execute_db_query, is_read_only_query, test_db_connection
+from db_connector import execute_db_query, is_read_only_query, test_db_connection, cursor_registry, export_query, query_jobs, schema_cache, get_statement_timeout
+from log_reader import tail_lines, count_lines, follow_file
+from log_search import search_logs
+from status_cache import StatusCache
+from process_snapshot import process_snapshot
+from system_stats import system_stats
+from dir_listing import listing_cache, skip_hidden, LISTING_PAGE_SIZE, RECURSIVE_MAX_DEPTH
+from file_reader import read_window
+from file_search import search_filenames, search_content
+from registry_store import get_registry_store, RegistryConflict
+from process_supervisor import supervisor
+from status_events import StatusBroadcaster, sse_stream
 
 
 
@@ -17,18 +28,43 @@ app.secret_key = os.getenv('SECRET_KEY', 'dev_key')
 # Store current environment in memory (can be switched via UI)
 current_env = os.getenv('APP_ENV', 'development')
 
+# Web file viewer: file di atas batas ini dimuat per window baris
+WEB_FILE_FULL_MAX_BYTES = 1024 * 1024
+WEB_FILE_WINDOW_LINES = 2000
+
 # 2. Fungsi Load Config Dinamis
 def load_registry(env=None):
-    """Load service registry berdasarkan environment (dev/prod)."""
+    """Load service registry berdasarkan environment (dev/prod), di-cache di memory (jangan dimutasi)."""
     global current_env
     if env:
         current_env = env
-    path = 'configs/registry_prod.json' if current_env == 'production' else 'configs/registry_dev.json'
-    try:
-        with open(path, 'r') as f:
-            return json.load(f)
-    except Exception as e:
-        return {"error": str(e), "services": []}
+    return get_registry_store(current_env).load()
+
+def resolve_web_directory(service):
+    """
+    Web directory service. Priority: 1. web_directory field, 2. config_file parent dir,
+    3. extract from command_start (e.g., "cd C:/path && npm start").
+    """
+    web_dir = service.get('web_directory', '')
+    
+    # Fallback to config_file parent directory
+    if not web_dir or not os.path.exists(web_dir):
+        config_file = service.get('config_file', '')
+        if config_file:
+            web_dir = os.path.dirname(config_file)
+    
+    # Fallback: extract from command_start
+    if not web_dir or not os.path.exists(web_dir):
+        command_start = service.get('command_start', '')
+        match = re.search(r'cd\s+([^\s&]+)', command_start)
+        if match:
+            web_dir = match.group(1)
+    
+    return web_dir
+
+def find_service(service_id):
+    """Cari service di registry environment aktif lewat index id."""
+    return get_registry_store(current_env).get_service(service_id)
 
 def load_app_config():
     """Load konfigurasi admin user."""
@@ -41,26 +77,15 @@ def get_current_env():
     return current_env
 
 # 3. Helper System Command
-def run_cmd(command):
-    """Menjalankan perintah shell."""
-    try:
-        subprocess.Popen(command, shell=True)
-        return True, "Command executed"
-    except Exception as e:
-        return False, str(e)
+def find_service_pids(keyword):
+    """PID proses yang name/cmdline-nya mengandung keyword (snapshot bersama per siklus polling)."""
+    return process_snapshot.find_pids(keyword)
 
 def check_service_status(keyword):
     """Cek apakah service dengan keyword tertentu sedang berjalan."""
-    for proc in psutil.process_iter(['name', 'cmdline']):
-        try:
-            cmdline = ' '.join(proc.info.get('cmdline', []) or [])
-            if keyword.lower() in cmdline.lower() or keyword.lower() in (proc.info.get('name', '') or '').lower():
-                return True
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            continue
-    return False
-
-def evaluate_service_status(service_config):
+    return bool(find_service_pids(keyword))
+
+def evaluate_service_status(service_config, timeout=5):
     """
     Evaluates service status using command_status (systemctl) if available,
     otherwise falls back to psutil keyword check.
@@ -73,7 +98,7 @@ def evaluate_service_status(service_config):
                 command, shell=True,
                 stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
             )
-            stdout, _ = process.communicate(timeout=5)
+            stdout, _ = process.communicate(timeout=timeout)
             status_output = stdout.strip().lower()
             
             if status_output == "active":
@@ -97,13 +122,41 @@ def evaluate_service_status(service_config):
     
     return "Stopped"
 
+# Shared status cache: probes run concurrently, one refresh in flight at a time
+status_cache = StatusCache(evaluate_service_status)
+# Service yang state-nya berubah di supervisor di-probe ulang saat tidak lagi dilacak
+supervisor.subscribe(lambda event: status_cache.invalidate(event['service_id']))
+
+def get_service_statuses(services):
+    """
+    Get status for a list of services. Services started from the dashboard are
+    read from the process supervisor; the rest go through the shared TTL cache.
+    """
+    statuses = {svc['id']: supervisor.status(svc['id']) for svc in services}
+    # Service yang failed tetap di-probe: bisa saja sudah dijalankan ulang di luar dashboard
+    unmanaged = [svc for svc in services if statuses[svc['id']] in (None, 'Error')]
+    if unmanaged:
+        cfg = load_app_config()
+        status_cache.configure(ttl=cfg.get('status_cache_ttl_seconds', 3),
+                               probe_timeout=cfg.get('status_probe_timeout_seconds', 5))
+        for service_id, status in status_cache.get_statuses(unmanaged).items():
+            if statuses[service_id] == 'Error':
+                if status != 'Running':
+                    continue
+                supervisor.forget_failed(service_id)
+            statuses[service_id] = status
+    return statuses
+
 def get_system_stats():
-    """Mendapatkan statistik sistem (CPU, Memory, Disk)."""
-    return {
-        'cpu_percent': psutil.cpu_percent(interval=1),
-        'memory': psutil.virtual_memory()._asdict(),
-        'disk': psutil.disk_usage('/')._asdict()
-    }
+    """Mendapatkan statistik sistem (CPU, Memory, Disk, Network) dari sample terakhir."""
+    return system_stats.latest()
+
+# Satu evaluator bersama untuk semua dashboard yang terbuka (SSE /api/events)
+status_events = StatusBroadcaster(lambda: load_registry().get('services', []),
+                                  get_service_statuses, get_system_stats)
+supervisor.subscribe(status_events.notify)
+# Hasil probe (termasuk yang selesai terlambat) langsung di-push, tanpa menunggu siklus evaluator
+status_cache.subscribe(status_events.notify)
 
 # --- ROUTES ---
 
@@ -114,6 +167,7 @@ def login():
         if request.form['username'] == cfg['admin_username'] and \
            request.form['password'] == cfg['admin_password']:
             session['logged_in'] = True
+            session['username'] = request.form['username']
             return redirect(url_for('dashboard'))
         else:
             flash('Invalid Credentials', 'error')
@@ -138,12 +192,13 @@ def dashboard():
     
     # Cek status service realtime & database availability
     services = registry.get('services', [])
-    for svc in services:
-        svc['status'] = evaluate_service_status(svc)
-        svc['has_database'] = 'database' in svc
+    statuses = get_service_statuses(services)
+    # Salinan per request, registry di memory dipakai bersama
+    services = [dict(svc, status=statuses.get(svc['id'], 'Unknown'), has_database='database' in svc)
+                for svc in services]
         
     return render_template('dashboard.html', 
-                           data=registry, 
+                           data=dict(registry, services=services), 
                            stats=stats,
                            env=get_current_env())
 
@@ -160,54 +215,49 @@ def switch_env(env_type):
 
 @app.route('/action/<service_id>/<action_type>')
 def service_action(service_id, action_type):
-    registry = load_registry()
-    service = next((s for s in registry['services'] if s['id'] == service_id), None)
+    service = find_service(service_id)
     
     if service:
-        cmd = service['command_start'] if action_type == 'start' else service['command_stop']
-        success, msg = run_cmd(cmd)
+        if action_type == 'start':
+            success, msg = supervisor.start(service)
+        elif supervisor.is_managed(service_id):
+            # Proses milik supervisor: hentikan process group-nya saja
+            success, msg = supervisor.stop(service_id)
+        else:
+            # Dijalankan di luar dashboard (atau sebelum app restart): pakai command_stop
+            success, msg = supervisor.run_command(service['command_stop'])
+        status_cache.invalidate(service_id)
+        status_events.notify()
         if success:
-            flash(f"Service {service_id} {action_type}ed successfully.", 'success')
+            flash(f"Service {service_id} {action_type}ed successfully. {msg}", 'success')
         else:
             flash(f"Error: {msg}", 'error')
     
-    
-    # Tunggu sebentar (optional, for UX)
-    time.sleep(0.5)
     return redirect(url_for('dashboard'))
 
 @app.route('/logs/<service_id>')
 def view_logs(service_id):
-    registry = load_registry()
-    service = next((s for s in registry['services'] if s['id'] == service_id), None)
+    service = find_service(service_id)
     
     if not service:
         return "Service not found", 404
         
     log_content = "Log file not found."
+    log_cursor = ""
     
     if os.path.exists(service.get('log_file', '')):
-        # Baca 50 baris terakhir
-        with open(service['log_file'], 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
-            log_content = "".join(lines[-50:])
+        # Posisi byte saat tail diambil, dipakai stream untuk melanjutkan tanpa gap
+        st = os.stat(service['log_file'])
+        log_cursor = f"{st.st_ino}:{st.st_size}"
+        # Baca 50 baris terakhir (seek dari akhir file, tanpa readlines)
+        log_content = tail_lines(service['log_file'], 50)
             
             
     # Calculate Web Directory for display
-    web_dir = service.get('web_directory', '')
-    if not web_dir or not os.path.exists(web_dir):
-        config_file = service.get('config_file', '')
-        if config_file:
-            web_dir = os.path.dirname(config_file)
-    
-    if not web_dir or not os.path.exists(web_dir):
-        import re
-        command_start = service.get('command_start', '')
-        match = re.search(r'cd\s+([^\s&]+)', command_start)
-        if match:
-            web_dir = match.group(1)
+    web_dir = resolve_web_directory(service)
 
-    return render_template('logs.html', service=service, content=log_content, env=get_current_env(), computed_web_dir=web_dir)
+    return render_template('logs.html', service=service, content=log_content, log_cursor=log_cursor,
+                           env=get_current_env(), computed_web_dir=web_dir)
 
 @app.route('/logs/<service_id>/directories')
 def get_log_directories(service_id):
@@ -215,8 +265,7 @@ def get_log_directories(service_id):
     if 'logged_in' not in session:
         return jsonify({"error": "Unauthorized"}), 401
     
-    registry = load_registry()
-    service = next((s for s in registry['services'] if s['id'] == service_id), None)
+    service = find_service(service_id)
     
     if not service:
         return jsonify({"error": "Service not found"}), 404
@@ -230,25 +279,28 @@ def get_log_directories(service_id):
     if not log_dir or not os.path.exists(log_dir):
         return jsonify({"error": f"Log directory not found: {log_dir}"}), 404
     
-    items = []
     try:
-        for item in os.scandir(log_dir):
-            item_info = {
-                'name': item.name,
-                'path': item.path.replace('\\', '/'),
-                'is_dir': item.is_dir(),
-                'size': item.stat().st_size if item.is_file() else 0,
-                'modified': item.stat().st_mtime
-            }
-            items.append(item_info)
-        
         # Sort: directories first, then files by modified time (newest first)
-        items.sort(key=lambda x: (not x['is_dir'], -x['modified']))
+        # Listing di-cache per mtime direktori, dipaginasi dengan ?cursor=&limit=
+        page = listing_cache.page(log_dir, cursor=request.args.get('cursor'),
+                                  limit=request.args.get('limit', LISTING_PAGE_SIZE),
+                                  sort='mtime', skip=skip_hidden)
+        items = [{
+            'name': item['name'],
+            'path': item['path'].replace('\\', '/'),
+            'is_dir': item['is_dir'],
+            'size': item['size'],
+            'modified': item['modified']
+        } for item in page['items']]
         
         return jsonify({
             "directory": log_dir.replace('\\', '/'),
-            "items": items
+            "items": items,
+            "total": page['total'],
+            "next_cursor": page['next_cursor']
         })
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -260,10 +312,12 @@ def get_log_file_content(service_id):
         return jsonify({"error": "Unauthorized"}), 401
     
     file_path = request.args.get('path', '')
-    lines_count = int(request.args.get('lines', 50))
+    try:
+        lines_count = int(request.args.get('lines', 50))
+    except ValueError:
+        return jsonify({"error": "lines must be an integer"}), 400
     
-    registry = load_registry()
-    service = next((s for s in registry['services'] if s['id'] == service_id), None)
+    service = find_service(service_id)
     
     if not service:
         return jsonify({"error": "Service not found"}), 404
@@ -283,49 +337,119 @@ def get_log_file_content(service_id):
         return jsonify({"error": "Access denied: file outside log directory"}), 403
     
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
-            content = "".join(lines[-lines_count:])
+        content = tail_lines(file_path, lines_count)
         
         return jsonify({
             "file": os.path.basename(file_path),
             "path": file_path.replace('\\', '/'),
             "content": content,
-            "total_lines": len(lines)
+            "total_lines": count_lines(file_path)
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
-@app.route('/logs/<service_id>/web-directories')
-def get_web_directories(service_id):
-    """Get list of directories and files in the web app folder."""
+@app.route('/logs/<service_id>/stream')
+def stream_log_file(service_id):
+    """Stream new log lines via Server-Sent Events (tail -f), resumable by byte offset."""
     if 'logged_in' not in session:
         return jsonify({"error": "Unauthorized"}), 401
     
-    registry = load_registry()
-    service = next((s for s in registry['services'] if s['id'] == service_id), None)
+    service = find_service(service_id)
     
     if not service:
         return jsonify({"error": "Service not found"}), 404
     
-    # Priority: 1. web_directory field, 2. config_file parent dir, 3. extract from command_start
-    web_dir = service.get('web_directory', '')
+    log_file = service.get('log_file', '')
+    file_path = request.args.get('path', '') or log_file
+    if not file_path:
+        return jsonify({"error": "Log file not configured"}), 404
     
-    # Fallback to config_file parent directory
-    if not web_dir or not os.path.exists(web_dir):
-        config_file = service.get('config_file', '')
-        if config_file:
-            web_dir = os.path.dirname(config_file)
+    # Security: Ensure the file path is within the log directory
+    abs_file_path = os.path.abspath(file_path)
+    abs_log_dir = os.path.abspath(os.path.dirname(log_file))
+    if not abs_file_path.startswith(abs_log_dir):
+        return jsonify({"error": "Access denied: file outside log directory"}), 403
     
-    # Fallback: extract from command_start (e.g., "cd C:/path && npm start")
-    if not web_dir or not os.path.exists(web_dir):
-        import re
-        command_start = service.get('command_start', '')
-        match = re.search(r'cd\s+([^\s&]+)', command_start)
-        if match:
-            web_dir = match.group(1)
+    # Cursor "inode:offset" dari Last-Event-ID (auto reconnect) atau query param
+    cursor = request.headers.get('Last-Event-ID') or request.args.get('cursor', '')
+    inode, offset = None, None
+    if cursor:
+        try:
+            ino_str, _, off_str = cursor.rpartition(':')
+            inode = int(ino_str) if ino_str else None
+            offset = int(off_str)
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
+    
+    def generate():
+        for event, ino, pos, content in follow_file(file_path, offset=offset, inode=inode):
+            if event == 'heartbeat':
+                # Komentar SSE, menjaga koneksi & mendeteksi client disconnect
+                yield ": keep-alive\n\n"
+                continue
+            payload = json.dumps({"content": content, "offset": pos})
+            yield f"id: {ino}:{pos}\nevent: {event}\ndata: {payload}\n\n"
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route('/logs/<service_id>/search')
+def search_log_files(service_id):
+    """Search daily logs and archives with a regex and optional time range."""
+    if 'logged_in' not in session:
+        return jsonify({"error": "Unauthorized"}), 401
+    
+    service = find_service(service_id)
+    
+    if not service:
+        return jsonify({"error": "Service not found"}), 404
+    
+    log_file = service.get('log_file', '')
+    log_dir = os.path.dirname(log_file)
+    if not log_dir or not os.path.exists(log_dir):
+        return jsonify({"error": f"Log directory not found: {log_dir}"}), 404
     
+    pattern = request.args.get('q', '')
+    if not pattern:
+        return jsonify({"error": "q is required"}), 400
+    
+    try:
+        start = datetime.fromisoformat(request.args['from']) if request.args.get('from') else None
+        end = datetime.fromisoformat(request.args['to']) if request.args.get('to') else None
+    except ValueError as e:
+        return jsonify({"error": f"Invalid time range: {str(e)}"}), 400
+    
+    try:
+        limit = max(1, min(int(request.args.get('limit', 500)), 5000))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    ignore_case = request.args.get('case', 'insensitive') != 'sensitive'
+    
+    try:
+        result = search_logs(log_dir, pattern, start=start, end=end, ignore_case=ignore_case, limit=limit)
+    except re.error as e:
+        return jsonify({"error": f"Invalid regex: {str(e)}"}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    
+    result["directory"] = log_dir.replace('\\', '/')
+    return jsonify(result)
+
+
+@app.route('/logs/<service_id>/web-directories')
+def get_web_directories(service_id):
+    """Get list of directories and files in the web app folder."""
+    if 'logged_in' not in session:
+        return jsonify({"error": "Unauthorized"}), 401
+    
+    service = find_service(service_id)
+    
+    if not service:
+        return jsonify({"error": "Service not found"}), 404
+    
+    web_dir = resolve_web_directory(service)
     if not web_dir or not os.path.exists(web_dir):
         return jsonify({"error": f"Web directory not found. Please configure 'Web Directory' in Service Manager."}), 404
 
@@ -343,38 +467,99 @@ def get_web_directories(service_id):
             return jsonify({"error": "Access denied: path outside web directory"}), 403
         web_dir = target_dir
     
-    items = []
+    # Calculate path relative to the ORIGINAL root (or config file dir)
+    # This ensures that when the frontend sends this path back, it's correct relative to root
+    base_rel_dir = os.path.dirname(service.get('config_file', '')) if service.get('config_file') else original_web_dir
+    if not base_rel_dir: base_rel_dir = original_web_dir
+    
+    def to_item(item):
+        info = {
+            'name': item['name'],
+            'path': os.path.relpath(item['path'], base_rel_dir).replace('\\', '/'),
+            'full_path': item['path'].replace('\\', '/'),
+            'is_dir': item['is_dir'],
+            'size': item['size'],
+            'modified': item['modified']
+        }
+        if 'depth' in item:
+            info['depth'] = item['depth']
+        return info
+    
     try:
-        for item in os.scandir(web_dir):
-            # Skip hidden files and node_modules
-            if item.name.startswith('.') or item.name == 'node_modules':
-                continue
-                
-            # Calculate path relative to the ORIGINAL root (or config file dir)
-            # This ensures that when the frontend sends this path back, it's correct relative to root
-            base_rel_dir = os.path.dirname(service.get('config_file', '')) if service.get('config_file') else original_web_dir
-            if not base_rel_dir: base_rel_dir = original_web_dir
-
-            item_info = {
-                'name': item.name,
-                'path': os.path.relpath(item.path, base_rel_dir).replace('\\', '/'),
-                'full_path': item.path.replace('\\', '/'),
-                'is_dir': item.is_dir(),
-                'size': item.stat().st_size if item.is_file() else 0,
-                'modified': item.stat().st_mtime
-            }
-            items.append(item_info)
+        # Sort: directories first, then files alphabetically (skip hidden files and node_modules)
+        # ?recursive=1 mengembalikan subtree (depth-first) dari cache listing per direktori
+        if request.args.get('recursive') == '1':
+            depth = min(int(request.args.get('depth', RECURSIVE_MAX_DEPTH)), RECURSIVE_MAX_DEPTH)
+            tree, truncated = listing_cache.walk(web_dir, max_depth=depth)
+            return jsonify({
+                "directory": web_dir.replace('\\', '/'),
+                "base_directory": os.path.dirname(service.get('config_file', '')).replace('\\', '/'),
+                "items": [to_item(item) for item in tree],
+                "total": len(tree),
+                "truncated": truncated,
+                "next_cursor": None
+            })
         
-        # Sort: directories first, then files alphabetically
-        items.sort(key=lambda x: (not x['is_dir'], x['name'].lower()))
+        page = listing_cache.page(web_dir, cursor=request.args.get('cursor'),
+                                  limit=request.args.get('limit', LISTING_PAGE_SIZE))
         
         return jsonify({
             "directory": web_dir.replace('\\', '/'),
             "base_directory": os.path.dirname(service.get('config_file', '')).replace('\\', '/'),
-            "items": items
+            "items": [to_item(item) for item in page['items']],
+            "total": page['total'],
+            "next_cursor": page['next_cursor']
         })
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/logs/<service_id>/web-search')
+def search_web_files(service_id):
+    """Fuzzy filename search (mode=files) or regex content search (mode=content) in the web directory."""
+    if 'logged_in' not in session:
+        return jsonify({"error": "Unauthorized"}), 401
+    
+    service = find_service(service_id)
+    
+    if not service:
+        return jsonify({"error": "Service not found"}), 404
+    
+    web_dir = resolve_web_directory(service)
+    if not web_dir or not os.path.exists(web_dir):
+        return jsonify({"error": f"Web directory not found. Please configure 'Web Directory' in Service Manager."}), 404
+    
+    query = request.args.get('q', '')
+    if not query:
+        return jsonify({"error": "q is required"}), 400
+    
+    mode = request.args.get('mode', 'files')
+    
+    try:
+        if mode == 'content':
+            limit = max(1, min(int(request.args.get('limit', 500)), 5000))
+            ignore_case = request.args.get('case', 'insensitive') != 'sensitive'
+            result = search_content(web_dir, query, ignore_case=ignore_case,
+                                    glob=request.args.get('glob') or None, limit=limit)
+        elif mode == 'files':
+            limit = max(1, min(int(request.args.get('limit', 50)), 500))
+            result = search_filenames(web_dir, query, limit=limit)
+        else:
+            return jsonify({"error": "mode must be 'files' or 'content'"}), 400
+    except re.error as e:
+        return jsonify({"error": f"Invalid regex: {str(e)}"}), 400
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+    
+    # full_path untuk membuka file lewat /web-file
+    for match in result["matches"]:
+        match["full_path"] = os.path.join(web_dir, match["path"]).replace('\\', '/')
+    result["directory"] = web_dir.replace('\\', '/')
+    return jsonify(result)
 
 
 @app.route('/logs/<service_id>/web-file')
@@ -385,8 +570,7 @@ def get_web_file_content(service_id):
     
     file_path = request.args.get('path', '')
     
-    registry = load_registry()
-    service = next((s for s in registry['services'] if s['id'] == service_id), None)
+    service = find_service(service_id)
     
     if not service:
         return jsonify({"error": "Service not found"}), 404
@@ -399,7 +583,6 @@ def get_web_file_content(service_id):
     web_dir = os.path.dirname(config_file) if config_file else None
     
     if not web_dir:
-        import re
         command_start = service.get('command_start', '')
         match = re.search(r'cd\s+([^\s&]+)', command_start)
         if match:
@@ -412,9 +595,6 @@ def get_web_file_content(service_id):
             return jsonify({"error": "Access denied: file outside web directory"}), 403
     
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-        
         # Detect file extension for syntax highlighting
         ext = os.path.splitext(file_path)[1].lower()
         lang_map = {
@@ -423,13 +603,22 @@ def get_web_file_content(service_id):
             '.env': 'shell', '.sh': 'bash', '.sql': 'sql', '.yml': 'yaml', '.yaml': 'yaml'
         }
         
-        return jsonify({
-            "file": os.path.basename(file_path),
-            "path": file_path.replace('\\', '/'),
-            "content": content,
-            "language": lang_map.get(ext, 'text'),
-            "total_lines": content.count('\n') + 1
-        })
+        # File kecil dikirim utuh; file besar per window (?start_line=&lines= atau ?offset=&length=)
+        if request.args.get('offset') is not None:
+            window = read_window(file_path, offset=request.args.get('offset'),
+                                 length=request.args.get('length'))
+        elif request.args.get('start_line') is not None or os.path.getsize(file_path) > WEB_FILE_FULL_MAX_BYTES:
+            window = read_window(file_path, start_line=request.args.get('start_line', 1),
+                                 line_count=request.args.get('lines', WEB_FILE_WINDOW_LINES))
+        else:
+            window = read_window(file_path, offset=0, length=WEB_FILE_FULL_MAX_BYTES)
+        
+        return jsonify(dict(window,
+                            file=os.path.basename(file_path),
+                            path=file_path.replace('\\', '/'),
+                            language=lang_map.get(ext, 'text')))
+    except ValueError as e:
+        return jsonify({"error": f"Invalid range: {e}"}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -438,8 +627,7 @@ def get_web_file_content(service_id):
 
 @app.route('/config/<service_id>', methods=['GET', 'POST'])
 def edit_config(service_id):
-    registry = load_registry()
-    service = next((s for s in registry['services'] if s['id'] == service_id), None)
+    service = find_service(service_id)
     
     if request.method == 'POST':
         new_content = request.form['content']
@@ -479,25 +667,18 @@ def settings():
     app_config = load_app_config()
     app_config_json = json.dumps(app_config, indent=4)
     
-    # Load registry files for editing
-    try:
-        with open('configs/registry_dev.json', 'r') as f:
-            registry_dev_json = f.read()
-    except:
-        registry_dev_json = '{}'
-    
-    try:
-        with open('configs/registry_prod.json', 'r') as f:
-            registry_prod_json = f.read()
-    except:
-        registry_prod_json = '{}'
+    # Load registry files for editing (etag dikirim balik saat save untuk deteksi konflik)
+    registry_dev_json, registry_dev_etag = get_registry_store('development').read_raw()
+    registry_prod_json, registry_prod_etag = get_registry_store('production').read_raw()
     
     return render_template('settings.html', 
                            env=get_current_env(),
                            app_config=app_config,
                            app_config_json=app_config_json,
                            registry_dev_json=registry_dev_json,
-                           registry_prod_json=registry_prod_json)
+                           registry_prod_json=registry_prod_json,
+                           registry_dev_etag=registry_dev_etag or '',
+                           registry_prod_etag=registry_prod_etag or '')
 
 
 @app.route('/settings/save-registry/<env_type>', methods=['POST'])
@@ -507,7 +688,7 @@ def save_registry(env_type):
         flash('Invalid environment type', 'error')
         return redirect(url_for('settings'))
     
-    file_path = f'configs/registry_{env_type}.json'
+    store = get_registry_store('production' if env_type == 'prod' else 'development')
     json_content = request.form.get('registry_json', '{}')
     
     try:
@@ -519,12 +700,13 @@ def save_registry(env_type):
             flash('Registry must contain "services" array', 'error')
             return redirect(url_for('settings'))
         
-        # Save file
-        with open(file_path, 'w') as f:
-            json.dump(parsed_json, f, indent=4)
+        # Save file (atomic, cache in-memory ikut diperbarui)
+        store.save(parsed_json, etag=request.form.get('etag'), user=session.get('username'))
         
         env_name = 'Development' if env_type == 'dev' else 'Production'
         flash(f'{env_name} registry saved successfully!', 'success')
+    except RegistryConflict as e:
+        flash(f'Registry not saved: {str(e)}', 'error')
     except json.JSONDecodeError as e:
         flash(f'Invalid JSON format: {str(e)}', 'error')
     except Exception as e:
@@ -536,22 +718,15 @@ def save_registry(env_type):
 def manage_services():
     """Service Manager page to edit dev/prod service registries."""
     # Load both registries
-    try:
-        with open('configs/registry_dev.json', 'r') as f:
-            dev_registry = json.load(f)
-        dev_services = dev_registry.get('services', [])
-    except:
-        dev_services = []
-    
-    try:
-        with open('configs/registry_prod.json', 'r') as f:
-            prod_registry = json.load(f)
-        prod_services = prod_registry.get('services', [])
-    except:
-        prod_services = []
+    dev_store = get_registry_store('development')
+    prod_store = get_registry_store('production')
+    dev_services = dev_store.load().get('services', [])
+    prod_services = prod_store.load().get('services', [])
     
     return render_template('services.html',
                            env=get_current_env(),
+                           dev_etag=dev_store.etag or '',
+                           prod_etag=prod_store.etag or '',
                            dev_services=dev_services,
                            prod_services=prod_services,
                            dev_services_json=json.dumps(dev_services),
@@ -595,34 +770,19 @@ def save_service():
             'saved_queries': saved_queries
         }
 
-    # Determine file path
-    file_path = 'configs/registry_prod.json' if env_target == 'production' else 'configs/registry_dev.json'
+    if not original_id:
+        # Add new service - Default Status STOPPED
+        new_service['status'] = 'Stopped'
     
     try:
-        with open(file_path, 'r') as f:
-            registry = json.load(f)
-        
-        services = registry.get('services', [])
-        
-        if original_id:
-            # Update existing service
-            for i, svc in enumerate(services):
-                if svc['id'] == original_id:
-                    # Preserve existing status!
-                    new_service['status'] = svc.get('status', 'Stopped')
-                    services[i] = new_service
-                    break
-        else:
-            # Add new service - Default Status STOPPED
-            new_service['status'] = 'Stopped'
-            services.append(new_service)
-        
-        registry['services'] = services
-        
-        with open(file_path, 'w') as f:
-            json.dump(registry, f, indent=4)
+        # Update existing service (status lama dipertahankan) atau tambah baru
+        get_registry_store(env_target).upsert_service(new_service, original_id=original_id or None,
+                                                      etag=request.form.get(f'etag_{env_target}'),
+                                                      user=session.get('username'))
         
         flash(f'Service "{new_service["name"]}" saved to {env_target}!', 'success')
+    except RegistryConflict as e:
+        flash(f'Service not saved: {str(e)}', 'error')
     except Exception as e:
         flash(f'Error saving service: {str(e)}', 'error')
     
@@ -631,19 +791,13 @@ def save_service():
 @app.route('/services/delete/<env>/<service_id>')
 def delete_service(env, service_id):
     """Delete a service from the registry."""
-    file_path = 'configs/registry_prod.json' if env == 'production' else 'configs/registry_dev.json'
-    
     try:
-        with open(file_path, 'r') as f:
-            registry = json.load(f)
-        
-        services = registry.get('services', [])
-        registry['services'] = [s for s in services if s['id'] != service_id]
-        
-        with open(file_path, 'w') as f:
-            json.dump(registry, f, indent=4)
+        get_registry_store(env).delete_service(service_id, etag=request.args.get('etag'),
+                                               user=session.get('username'))
         
         flash(f'Service "{service_id}" deleted from {env}!', 'success')
+    except RegistryConflict as e:
+        flash(f'Service not deleted: {str(e)}', 'error')
     except Exception as e:
         flash(f'Error deleting service: {str(e)}', 'error')
     
@@ -670,8 +824,7 @@ def database_execute():
         return jsonify({"error": "query is required"}), 400
     
     # Cari service dari registry
-    registry = load_registry()
-    service = next((s for s in registry.get('services', []) if s['id'] == service_id), None)
+    service = find_service(service_id)
     
     if not service:
         return jsonify({"error": f"Service '{service_id}' not found"}), 404
@@ -683,8 +836,130 @@ def database_execute():
     if not is_read_only_query(query_string):
         return jsonify({"error": "Only SELECT, SHOW, DESCRIBE, and EXPLAIN queries are allowed"}), 403
     
-    # Execute query
-    result = execute_db_query(service, query_string)
+    # format=columnar: column names sent once, rows as arrays (orient=rows) or per-column arrays (orient=columns)
+    result_format = data.get('format', 'objects')
+    orient = data.get('orient', 'rows')
+    if result_format not in ('objects', 'columnar') or orient not in ('rows', 'columns'):
+        return jsonify({"error": "format must be 'objects' or 'columnar', orient must be 'rows' or 'columns'"}), 400
+    
+    # Execute query (saved queries with cache_ttl may be served from the result cache)
+    result = execute_db_query(service, query_string,
+                              params=data.get('params'),
+                              force_refresh=bool(data.get('refresh')),
+                              result_format=result_format,
+                              orient=orient,
+                              statement_timeout=get_statement_timeout(service))
+    
+    if "error" in result:
+        return jsonify(result), 422 if result.get("rejected_by") else 500
+    
+    return jsonify(result)
+
+
+@app.route('/api/database/jobs', methods=['POST'])
+def database_job_submit():
+    """Submit a query to run in the background; returns a job id to poll or cancel."""
+    if 'logged_in' not in session:
+        return jsonify({"error": "Unauthorized"}), 401
+    
+    data = request.get_json()
+    if not data:
+        return jsonify({"error": "Invalid request body"}), 400
+    
+    service_id = data.get('service_id', '')
+    query_string = data.get('query', '').strip()
+    
+    if not service_id:
+        return jsonify({"error": "service_id is required"}), 400
+    if not query_string:
+        return jsonify({"error": "query is required"}), 400
+    
+    service = find_service(service_id)
+    
+    if not service:
+        return jsonify({"error": f"Service '{service_id}' not found"}), 404
+    
+    if 'database' not in service:
+        return jsonify({"error": f"Service '{service_id}' has no database configuration"}), 400
+    
+    # Read-only guard
+    if not is_read_only_query(query_string):
+        return jsonify({"error": "Only SELECT, SHOW, DESCRIBE, and EXPLAIN queries are allowed"}), 403
+    
+    result_format = data.get('format', 'objects')
+    orient = data.get('orient', 'rows')
+    if result_format not in ('objects', 'columnar') or orient not in ('rows', 'columns'):
+        return jsonify({"error": "format must be 'objects' or 'columnar', orient must be 'rows' or 'columns'"}), 400
+    
+    result = query_jobs.submit(service, query_string, session.get('username', 'admin'),
+                               params=data.get('params'), force_refresh=bool(data.get('refresh')),
+                               result_format=result_format, orient=orient)
+    
+    if "error" in result:
+        return jsonify(result), 429
+    
+    return jsonify(result), 202
+
+
+@app.route('/api/database/jobs/<job_id>', methods=['GET', 'DELETE'])
+def database_job(job_id):
+    """Job status and result (GET, ?wait=N long-polls up to N seconds) or cancel it (DELETE)."""
+    if 'logged_in' not in session:
+        return jsonify({"error": "Unauthorized"}), 401
+    
+    owner = session.get('username', 'admin')
+    if request.method == 'DELETE':
+        result = query_jobs.cancel(job_id, owner)
+    else:
+        try:
+            wait = min(max(float(request.args.get('wait', 0)), 0), 30)
+        except ValueError:
+            wait = 0
+        result = query_jobs.get(job_id, owner, wait=wait)
+    
+    if "error" in result and "job_id" not in result:
+        return jsonify(result), 404 if "not found" in result["error"] else 500
+    
+    return jsonify(result)
+
+
+@app.route('/api/database/cursor', methods=['POST'])
+def database_cursor_open():
+    """Execute a query on a server-side cursor and return the first page plus a cursor token."""
+    if 'logged_in' not in session:
+        return jsonify({"error": "Unauthorized"}), 401
+    
+    data = request.get_json()
+    if not data:
+        return jsonify({"error": "Invalid request body"}), 400
+    
+    service_id = data.get('service_id', '')
+    query_string = data.get('query', '').strip()
+    
+    if not service_id:
+        return jsonify({"error": "service_id is required"}), 400
+    if not query_string:
+        return jsonify({"error": "query is required"}), 400
+    
+    service = find_service(service_id)
+    
+    if not service:
+        return jsonify({"error": f"Service '{service_id}' not found"}), 404
+    
+    if 'database' not in service:
+        return jsonify({"error": f"Service '{service_id}' has no database configuration"}), 400
+    
+    # Read-only guard
+    if not is_read_only_query(query_string):
+        return jsonify({"error": "Only SELECT, SHOW, DESCRIBE, and EXPLAIN queries are allowed"}), 403
+    
+    try:
+        page_size = int(data.get('page_size', 100))
+    except (TypeError, ValueError):
+        return jsonify({"error": "page_size must be an integer"}), 400
+    
+    result = cursor_registry.open(service, query_string, session.get('username', 'admin'),
+                                  page_size=page_size)
     
     if "error" in result:
         return jsonify(result), 500
@@ -692,14 +967,77 @@ def database_execute():
     return jsonify(result)
 
 
+@app.route('/api/database/cursor/<token>', methods=['GET', 'DELETE'])
+def database_cursor(token):
+    """Fetch page N from an open cursor (GET ?page=N) or close it (DELETE)."""
+    if 'logged_in' not in session:
+        return jsonify({"error": "Unauthorized"}), 401
+    
+    owner = session.get('username', 'admin')
+    if request.method == 'DELETE':
+        closed = cursor_registry.close(token, owner=owner)
+        return jsonify({"success": closed})
+    
+    try:
+        page = int(request.args.get('page', 1))
+    except ValueError:
+        return jsonify({"error": "page must be an integer"}), 400
+    
+    result = cursor_registry.fetch_page(token, owner, page)
+    
+    if "error" in result:
+        return jsonify(result), 404
+    
+    return jsonify(result)
+
+
+@app.route('/api/database/export', methods=['GET', 'POST'])
+def database_export():
+    """Stream query results as CSV or NDJSON straight from a server-side cursor."""
+    if 'logged_in' not in session:
+        return jsonify({"error": "Unauthorized"}), 401
+    
+    # GET (download link) atau POST (form / JSON body)
+    data = request.get_json(silent=True) or request.values
+    service_id = data.get('service_id', '')
+    query_string = data.get('query', '').strip()
+    fmt = data.get('format', 'csv').lower()
+    
+    if not service_id:
+        return jsonify({"error": "service_id is required"}), 400
+    if not query_string:
+        return jsonify({"error": "query is required"}), 400
+    
+    service = find_service(service_id)
+    
+    if not service:
+        return jsonify({"error": f"Service '{service_id}' not found"}), 404
+    
+    if 'database' not in service:
+        return jsonify({"error": f"Service '{service_id}' has no database configuration"}), 400
+    
+    # Read-only guard
+    if not is_read_only_query(query_string):
+        return jsonify({"error": "Only SELECT, SHOW, DESCRIBE, and EXPLAIN queries are allowed"}), 403
+    
+    result = export_query(service, query_string, fmt)
+    if isinstance(result, dict):
+        return jsonify(result), 400 if result["error"].startswith("Unsupported") else 500
+    
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    filename = f"{service_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+    return Response(result, mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"',
+                             'X-Accel-Buffering': 'no'})
+
+
 @app.route('/api/database/info/<service_id>')
 def database_info(service_id):
     """Get database configuration info for a service."""
     if 'logged_in' not in session:
         return jsonify({"error": "Unauthorized"}), 401
     
-    registry = load_registry()
-    service = next((s for s in registry.get('services', []) if s['id'] == service_id), None)
+    service = find_service(service_id)
     
     if not service:
         return jsonify({"error": "Service not found"}), 404
@@ -715,6 +1053,28 @@ def database_info(service_id):
     })
 
 
+@app.route('/api/database/schema/<service_id>')
+def database_schema(service_id):
+    """Tables, columns, indexes and approximate row counts (cached, refreshed in background)."""
+    if 'logged_in' not in session:
+        return jsonify({"error": "Unauthorized"}), 401
+    
+    service = find_service(service_id)
+    
+    if not service:
+        return jsonify({"error": "Service not found"}), 404
+    
+    if not service.get('database'):
+        return jsonify({"error": "No database configuration"}), 404
+    
+    result = schema_cache.get(service, force_refresh=request.args.get('refresh') == '1')
+    
+    if "error" in result:
+        return jsonify(result), 500
+    
+    return jsonify(result)
+
+
 @app.route('/api/database/test', methods=['POST'])
 def database_test():
     """Test database connection for a specific service."""
@@ -729,8 +1089,7 @@ def database_test():
     if not service_id:
         return jsonify({"success": False, "error": "service_id is required"}), 400
     
-    registry = load_registry()
-    service = next((s for s in registry.get('services', []) if s['id'] == service_id), None)
+    service = find_service(service_id)
     
     if not service:
         return jsonify({"success": False, "error": "Service not found"}), 404
@@ -777,18 +1136,55 @@ def database_test_url():
 
 @app.route('/api/services/status')
 def services_status():
-    """Get real-time status for all services (polling endpoint)."""
+    """Get real-time status for all services (polling fallback for /api/events)."""
     if 'logged_in' not in session:
         return jsonify({"success": False, "error": "Unauthorized"}), 401
     
     registry = load_registry()
-    data = {}
-    for svc in registry.get('services', []):
-        data[svc['id']] = evaluate_service_status(svc)
+    data = get_service_statuses(registry.get('services', []))
     
     return jsonify({"success": True, "data": data})
 
 
+@app.route('/api/events')
+def status_event_stream():
+    """
+    Server-Sent Events for the dashboard: a snapshot on connect, then only
+    changed service statuses ('status') and the latest system stats ('stats').
+    """
+    if 'logged_in' not in session:
+        return jsonify({"success": False, "error": "Unauthorized"}), 401
+    
+    return Response(stream_with_context(sse_stream(status_events)), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route('/api/services/processes')
+def services_processes():
+    """Processes owned by the supervisor: state, pid, exit code, restart count."""
+    if 'logged_in' not in session:
+        return jsonify({"success": False, "error": "Unauthorized"}), 401
+    
+    return jsonify({"success": True, "data": supervisor.info()})
+
+
+@app.route('/api/system/stats')
+def system_stats_api():
+    """Get the latest system stats sample, optionally with history for sparklines."""
+    if 'logged_in' not in session:
+        return jsonify({"success": False, "error": "Unauthorized"}), 401
+    
+    result = {"success": True, "data": get_system_stats()}
+    if request.args.get('history'):
+        try:
+            seconds = max(0, min(int(request.args.get('seconds', 3600)), 3600))
+        except ValueError:
+            return jsonify({"success": False, "error": "seconds must be an integer"}), 400
+        result["history"] = system_stats.history(seconds)
+    
+    return jsonify(result)
+
+
 if __name__ == '__main__':
     port = int(os.getenv('APP_PORT', 5006))
     debug_mode = os.getenv('APP_ENV') == 'development'
@@ -5,8 +5,65 @@ menggunakan Connection String URI (RFC 3986).
 """
 
 import re
+import io
+import csv
+import json
+import math
+import time
+import uuid
+import threading
+from decimal import Decimal
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse, unquote
 
+# Default ukuran pool, bisa di-override per service di blok "database" registry:
+# pool_min_size, pool_max_size, pool_idle_timeout
+POOL_MIN_SIZE = 0
+POOL_MAX_SIZE = 5
+POOL_IDLE_TIMEOUT = 300
+POOL_ACQUIRE_TIMEOUT = 10
+POOL_PING_AFTER = 5
+
+# Batas waktu eksekusi per statement (detik), override per service: statement_timeout
+# (0 = tanpa batas). Berlaku untuk query, job, cursor, dan schema; hanya export yang
+# memakai pool tanpa batas.
+# MySQL: max_execution_time (hanya SELECT), PostgreSQL: statement_timeout
+STATEMENT_TIMEOUT = 30
+MYSQL_READ_TIMEOUT_MARGIN = 5
+
+# Query job (async): worker thread, umur hasil setelah selesai, batas job aktif per user
+JOB_WORKERS = 4
+JOB_RESULT_TTL = 600
+JOB_MAX_ACTIVE_PER_USER = 3
+
+MAX_RESULT_ROWS = 500
+RESULT_FORMATS = ('objects', 'columnar')
+JSON_NATIVE_TYPES = {type(None), int, float, bool, str}
+CURSOR_TTL = 60
+CURSOR_MAX_PER_USER = 3
+CURSOR_CACHED_PAGES = 5
+
+RESULT_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+# Cost guard (EXPLAIN sebelum eksekusi), aktif per service dengan explain_guard: true.
+# Override per service: explain_warn_rows, explain_max_rows, explain_max_cost (0 = tanpa batas), auto_limit
+EXPLAIN_WARN_ROWS = 1000000
+EXPLAIN_MAX_ROWS = 50000000
+EXPLAIN_MAX_COST = 0
+PLAN_CACHE_TTL = 300
+PLAN_CACHE_MAX_ENTRIES = 512
+
+# Cache metadata schema per service (override per service: schema_cache_ttl)
+SCHEMA_CACHE_TTL = 300
+
+# Batas export default, bisa di-override per service: export_max_rows, export_max_bytes
+EXPORT_MAX_ROWS = 5000000
+EXPORT_MAX_BYTES = 1024 * 1024 * 1024
+EXPORT_CHUNK_ROWS = 1000
+EXPORT_FORMATS = ('csv', 'ndjson')
+
 
 def get_connection_string(service_config):
     """
@@ -132,137 +189,1330 @@ def _test_postgresql(parsed):
         return {"success": False, "error": str(e)}
 
 
-def execute_db_query(service_config, query_string):
-    """
-    Mengeksekusi query database dan mengembalikan hasil.
-    Rows dikembalikan sebagai array-of-objects (untuk kompatibilitas AG Grid).
+# --- CONNECTION POOL ---
+
+def _resolve_engine(engine, parsed):
+    """Tentukan engine final dari config atau scheme URI."""
+    if engine == "mysql" or parsed["scheme"] == "mysql":
+        return "mysql"
+    if engine == "postgresql" or parsed["scheme"] == "postgresql":
+        return "postgresql"
+    return None
+
+
+def _connect_mysql(parsed, statement_timeout=0):
+    """Buka koneksi MySQL baru (autocommit, setiap statement transaksi sendiri)."""
+    try:
+        import pymysql
+    except ImportError:
+        raise RuntimeError("pymysql not installed. Run: pip install pymysql")
     
-    Returns:
-        dict: {"success": True, "columns": [...], "rows": [{...}, ...], "row_count": N}
-              atau {"error": "..."}
+    conn = pymysql.connect(
+        host=parsed["host"],
+        port=parsed["port"],
+        user=parsed["username"],
+        password=parsed["password"],
+        database=parsed["database"],
+        charset='utf8mb4',
+        cursorclass=pymysql.cursors.Cursor,
+        connect_timeout=5,
+        # Client menunggu sedikit lebih lama dari server agar error timeout datang dari server
+        read_timeout=statement_timeout + MYSQL_READ_TIMEOUT_MARGIN if statement_timeout else None,
+        autocommit=True
+    )
+    if statement_timeout:
+        # Sekali per koneksi baru; MariaDB memakai max_statement_time (detik)
+        if 'mariadb' in conn.get_server_info().lower():
+            sql = f"SET SESSION max_statement_time = {float(statement_timeout)}"
+        else:
+            sql = f"SET SESSION max_execution_time = {int(statement_timeout * 1000)}"
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(sql)
+        except Exception:
+            conn.close()
+            raise
+    return conn
+
+
+def _connect_postgresql(parsed, statement_timeout=0):
+    """Buka koneksi PostgreSQL baru (statement_timeout di-set saat startup, tanpa round trip)."""
+    try:
+        import psycopg2
+    except ImportError:
+        raise RuntimeError("psycopg2 not installed. Run: pip install psycopg2-binary")
+    
+    return psycopg2.connect(
+        host=parsed["host"],
+        port=parsed["port"],
+        user=parsed["username"],
+        password=parsed["password"],
+        dbname=parsed["database"],
+        connect_timeout=5,
+        options=f"-c statement_timeout={int(statement_timeout * 1000)}"
+    )
+
+
+def _is_connection_error(engine, error):
+    """True jika exception menandakan koneksi rusak (bukan sekadar query error)."""
+    try:
+        if engine == "mysql":
+            import pymysql
+            return isinstance(error, (pymysql.OperationalError, pymysql.InterfaceError))
+        import psycopg2
+        return isinstance(error, (psycopg2.OperationalError, psycopg2.InterfaceError))
+    except ImportError:
+        return True
+
+
+class ConnectionPool:
+    """
+    Pool koneksi per connection URI.
+    - min_size koneksi idle tidak pernah di-evict
+    - koneksi idle > idle_timeout detik ditutup
+    - health check saat borrow (ping jika idle > POOL_PING_AFTER detik)
+    - setiap checkout dipaksa read-only
+    """
+    def __init__(self, engine, parsed, min_size=POOL_MIN_SIZE, max_size=POOL_MAX_SIZE,
+                 idle_timeout=POOL_IDLE_TIMEOUT, acquire_timeout=POOL_ACQUIRE_TIMEOUT,
+                 statement_timeout=0):
+        self.engine = engine
+        self.parsed = parsed
+        self.statement_timeout = statement_timeout
+        self.min_size = min_size
+        self.max_size = max(1, max_size)
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self._idle = []  # [(conn, last_used)], yang paling lama di depan
+        self._in_use = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def _connect(self):
+        if self.engine == "mysql":
+            return _connect_mysql(self.parsed, self.statement_timeout)
+        return _connect_postgresql(self.parsed, self.statement_timeout)
+
+    def _close_quietly(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _evict_idle_locked(self):
+        now = time.monotonic()
+        while self._idle and len(self._idle) + self._in_use > self.min_size \
+                and now - self._idle[0][1] > self.idle_timeout:
+            conn, _ = self._idle.pop(0)
+            self._close_quietly(conn)
+
+    def _is_healthy(self, conn, idle_for):
+        if self.engine == "postgresql" and conn.closed:
+            return False
+        if idle_for < POOL_PING_AFTER:
+            return True
+        try:
+            if self.engine == "mysql":
+                conn.ping(reconnect=False)
+            else:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+            return True
+        except Exception:
+            return False
+
+    def _prepare(self, conn):
+        """Paksa sesi read-only untuk setiap checkout."""
+        if self.engine == "mysql":
+            with conn.cursor() as cursor:
+                cursor.execute("SET SESSION TRANSACTION READ ONLY")
+        else:
+            if conn.status != 1:  # bukan STATUS_READY, akhiri transaksi yang menggantung
+                conn.rollback()
+            conn.set_session(readonly=True, autocommit=True)
+
+    def acquire(self):
+        deadline = time.monotonic() + self.acquire_timeout
+        conn, last_used = None, 0
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Connection pool closed")
+                self._evict_idle_locked()
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    self._in_use += 1
+                    break
+                if self._in_use < self.max_size:
+                    self._in_use += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"Connection pool exhausted ({self.max_size} connections in use)")
+                self._cond.wait(remaining)
+        
+        try:
+            if conn is not None and not self._is_healthy(conn, time.monotonic() - last_used):
+                self._close_quietly(conn)
+                conn = None
+            if conn is None:
+                conn = self._connect()
+            self._prepare(conn)
+            return conn
+        except Exception:
+            if conn is not None:
+                self._close_quietly(conn)
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, conn, discard=False):
+        with self._cond:
+            self._in_use -= 1
+            if discard or self._closed:
+                self._close_quietly(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def cancel(self, conn):
+        """
+        Batalkan statement yang sedang berjalan di `conn` (dipanggil dari thread lain).
+        PostgreSQL: cancel request protocol (sama dengan pg_cancel_backend).
+        MySQL: KILL QUERY <thread_id> lewat koneksi terpisah di luar pool.
+        """
+        if self.engine == "postgresql":
+            conn.cancel()
+            return
+        killer = _connect_mysql(self.parsed)
+        try:
+            with killer.cursor() as cursor:
+                cursor.execute("KILL QUERY %s", (conn.thread_id(),))
+        finally:
+            self._close_quietly(killer)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        discard = False
+        try:
+            yield conn
+        except Exception as e:
+            discard = _is_connection_error(self.engine, e)
+            raise
+        finally:
+            self.release(conn, discard)
+
+    def close(self):
+        """Tutup semua koneksi idle; koneksi yang sedang dipakai ditutup saat release."""
+        with self._cond:
+            self._closed = True
+            for conn, _ in self._idle:
+                self._close_quietly(conn)
+            self._idle = []
+            self._cond.notify_all()
+
+
+_pools = {}               # pool key (URI terparse) -> ConnectionPool
+_service_pool_keys = {}   # (service id, pakai timeout) -> pool key terakhir
+_pools_lock = threading.Lock()
+
+
+def _pool_key(engine, parsed, statement_timeout):
+    return (engine, parsed["host"], parsed["port"], parsed["username"],
+            parsed["password"], parsed["database"], statement_timeout)
+
+
+def get_statement_timeout(service_config):
+    """Timeout statement (detik) untuk service ini (semua jalur kecuali export)."""
+    return float(service_config.get("database", {}).get("statement_timeout", STATEMENT_TIMEOUT))
+
+
+def get_pool(service_config, statement_timeout=0):
+    """
+    Ambil (atau buat) pool untuk service. Jika connection_url service berubah,
+    pool lama di-invalidate (ditutup) bila tidak dipakai service lain.
+    Koneksi dengan statement_timeout ada di pool terpisah dari koneksi tanpa batas
+    (statement_timeout=0, hanya untuk export), sehingga export panjang tidak terputus.
     """
     db_config = service_config.get("database", {})
-    engine = db_config.get("engine", "").lower()
-    
     conn_string = get_connection_string(service_config)
     if not conn_string:
-        return {"error": f"Connection string not found. Set '{db_config.get('connection_env_key', '?')}' in the service .env file."}
+        raise ValueError(f"Connection string not found. Set '{db_config.get('connection_env_key', '?')}' in the service .env file.")
+    
+    parsed = parse_connection_uri(conn_string)
+    engine = _resolve_engine(db_config.get("engine", "").lower(), parsed)
+    if not engine:
+        raise ValueError(f"Unsupported database engine: {db_config.get('engine', '')}")
+    
+    statement_timeout = float(statement_timeout or 0)
+    key = _pool_key(engine, parsed, statement_timeout)
+    # Satu slot per service per jenis pool (dengan / tanpa timeout)
+    slot = (service_config.get("id"), bool(statement_timeout))
+    with _pools_lock:
+        old_key = _service_pool_keys.get(slot)
+        if slot[0] and old_key and old_key != key:
+            _service_pool_keys[slot] = key
+            if old_key not in _service_pool_keys.values():
+                old_pool = _pools.pop(old_key, None)
+                if old_pool:
+                    old_pool.close()
+        if slot[0]:
+            _service_pool_keys[slot] = key
+        
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(
+                engine, parsed,
+                min_size=int(db_config.get("pool_min_size", POOL_MIN_SIZE)),
+                max_size=int(db_config.get("pool_max_size", POOL_MAX_SIZE)),
+                idle_timeout=float(db_config.get("pool_idle_timeout", POOL_IDLE_TIMEOUT)),
+                statement_timeout=statement_timeout
+            )
+            _pools[key] = pool
+        return pool
+
+
+# --- QUERY RESULT CACHE ---
+
+def normalize_sql(query_string):
+    """
+    Normalisasi SQL untuk cache key: buang komentar, rapatkan whitespace di luar
+    string literal, dan buang ';' di akhir.
+    """
+    pattern = r"""('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")|--[^\n]*|/\*.*?\*/|\s+"""
+    replace = lambda match: match.group(1) or ' '
+    # Pass kedua merapatkan spasi bekas komentar
+    normalized = re.sub(pattern, replace, query_string, flags=re.DOTALL)
+    normalized = re.sub(pattern, replace, normalized, flags=re.DOTALL)
+    return normalized.strip().rstrip(';').strip()
+
+
+def get_saved_query_ttl(service_config, normalized_sql):
+    """TTL cache (detik) dari definisi saved query yang SQL-nya sama; 0 = tidak di-cache."""
+    for saved in service_config.get("database", {}).get("saved_queries", []) or []:
+        if isinstance(saved, dict) and normalize_sql(saved.get("query", "")) == normalized_sql:
+            return float(saved.get("cache_ttl", 0) or 0)
+    return 0
+
+
+class QueryResultCache:
+    """Cache hasil query (LRU berdasarkan total byte) dengan TTL per entry."""
+    def __init__(self, max_bytes=RESULT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (result, size, stored_at, expires_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(service_config, normalized_sql, params=None, variant=None):
+        return (service_config.get("id"), get_connection_string(service_config) or "",
+                normalized_sql, json.dumps(params, sort_keys=True, default=str), variant)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, 0
+            result, size, stored_at, expires_at = entry
+            now = time.time()
+            if now >= expires_at:
+                del self._entries[key]
+                self._bytes -= size
+                return None, 0
+            self._entries.move_to_end(key)
+            return result, now - stored_at
+
+    def put(self, key, result, ttl):
+        size = len(json.dumps(result, default=str))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old:
+                self._bytes -= old[1]
+            self._entries[key] = (result, size, now, now + ttl)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted[1]
+
+    def invalidate(self, service_id=None):
+        with self._lock:
+            for key in [k for k in self._entries if service_id is None or k[0] == service_id]:
+                self._bytes -= self._entries.pop(key)[1]
+
+
+result_cache = QueryResultCache()
+
+
+# --- QUERY COST GUARD (EXPLAIN) ---
+
+def _top_level_sql(normalized_sql):
+    """SQL tanpa string literal dan isi kurung (subquery), lowercase, untuk cek klausa top-level."""
+    sql = re.sub(r"""'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|`[^`]*`""", "''", normalized_sql)
+    previous = None
+    while previous != sql:
+        previous = sql
+        sql = re.sub(r'\([^()]*\)', '()', sql)
+    return sql.lower()
+
+
+def apply_auto_limit(normalized_sql, limit):
+    """
+    Tambahkan LIMIT ke SELECT yang tidak dibatasi. Query yang sudah punya
+    LIMIT/FETCH/OFFSET, INTO, atau FOR UPDATE/SHARE di top-level tidak diubah.
+    """
+    if not normalized_sql.upper().startswith("SELECT"):
+        return normalized_sql
+    top = _top_level_sql(normalized_sql)
+    if re.search(r'\b(limit|fetch|offset|into|for\s+(update|share|no\s+key|key))\b', top):
+        return normalized_sql
+    return f"{normalized_sql} LIMIT {int(limit)}"
+
+
+def _plan_estimate_postgresql(plan):
+    """(rows, cost) dari EXPLAIN (FORMAT JSON): cost total + estimasi row terbesar di semua node."""
+    root = plan[0]["Plan"] if isinstance(plan, list) else plan["Plan"]
+    max_rows, stack = 0, [root]
+    while stack:
+        node = stack.pop()
+        max_rows = max(max_rows, node.get("Plan Rows", 0))
+        stack.extend(node.get("Plans", []))
+    return max_rows, float(root.get("Total Cost", 0))
+
+
+def _plan_estimate_mysql(plan):
+    """(rows, cost) dari EXPLAIN FORMAT=JSON: query_cost + rows_examined_per_scan terbesar."""
+    query_block = plan.get("query_block", {})
+    cost = float(query_block.get("cost_info", {}).get("query_cost", 0) or 0)
+    max_rows, stack = 0, [query_block]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if "rows_examined_per_scan" in node:
+                max_rows = max(max_rows, int(node["rows_examined_per_scan"] or 0))
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return max_rows, cost
+
+
+def explain_query(conn, engine, query_string, params=None):
+    """Jalankan EXPLAIN (tanpa mengeksekusi query) dan kembalikan (estimated_rows, cost)."""
+    with conn.cursor() as cursor:
+        if engine == "mysql":
+            cursor.execute("EXPLAIN FORMAT=JSON " + query_string, params)
+            plan = cursor.fetchone()[0]
+            return _plan_estimate_mysql(json.loads(plan) if isinstance(plan, (str, bytes)) else plan)
+        cursor.execute("EXPLAIN (FORMAT JSON) " + query_string, params)
+        plan = cursor.fetchone()[0]
+        return _plan_estimate_postgresql(json.loads(plan) if isinstance(plan, str) else plan)
+
+
+class PlanCache:
+    """Cache estimasi EXPLAIN per (service, normalized SQL, params) dengan TTL, LRU by jumlah entry."""
+    def __init__(self, ttl=PLAN_CACHE_TTL, max_entries=PLAN_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (estimate, stored_at)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[1] > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, estimate):
+        with self._lock:
+            self._entries[key] = (estimate, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+plan_cache = PlanCache()
+
+
+def check_query_cost(service_config, pool, conn, query_string, normalized_sql, params=None):
+    """
+    Pre-flight cost guard. Returns:
+        (None, warnings)  jika query boleh jalan (warnings bisa kosong)
+        (error, [])       jika estimasi melebihi batas reject
+    """
+    db_config = service_config.get("database", {})
+    if not normalized_sql.upper().startswith("SELECT"):
+        return None, []
+    
+    key = QueryResultCache.make_key(service_config, normalized_sql, params)
+    estimate = plan_cache.get(key)
+    if estimate is None:
+        estimate = explain_query(conn, pool.engine, query_string, params)
+        plan_cache.put(key, estimate)
+    rows, cost = estimate
+    
+    max_rows = int(db_config.get("explain_max_rows", EXPLAIN_MAX_ROWS))
+    max_cost = float(db_config.get("explain_max_cost", EXPLAIN_MAX_COST))
+    warn_rows = int(db_config.get("explain_warn_rows", EXPLAIN_WARN_ROWS))
+    if max_rows and rows > max_rows:
+        return f"Query rejected by cost guard: ~{rows:,} rows scanned (limit {max_rows:,}). Add a WHERE clause on an indexed column.", []
+    if max_cost and cost > max_cost:
+        return f"Query rejected by cost guard: estimated cost {cost:,.0f} (limit {max_cost:,.0f})", []
+    if warn_rows and rows > warn_rows:
+        return None, [f"Expensive query: ~{rows:,} rows scanned (estimated cost {cost:,.0f})"]
+    return None, []
+
+
+# --- QUERY EXECUTION ---
+
+
+def execute_db_query(service_config, query_string, params=None, force_refresh=False,
+                     result_format='objects', orient='rows', on_connection=None, statement_timeout=0):
+    """
+    Mengeksekusi query database dan mengembalikan hasil.
+    Rows dikembalikan sebagai array-of-objects (untuk kompatibilitas AG Grid),
+    atau format columnar jika result_format='columnar'.
+    Koneksi diambil dari pool per connection URI. Query yang sama dengan saved
+    query ber-cache_ttl dilayani dari cache (kecuali force_refresh).
+    on_connection(pool, conn) dipanggil sebelum eksekusi dan on_connection(pool, None) sesudahnya,
+    selagi koneksi masih dipegang (dipakai QueryJobManager untuk cancel).
+    statement_timeout > 0 memakai pool dengan batas waktu statement (lihat get_statement_timeout).
+    Jika service mengaktifkan explain_guard, SELECT tanpa LIMIT diberi LIMIT otomatis
+    dan dicek dulu dengan EXPLAIN; query di atas batas ditolak, di atas batas warn diberi warnings.
     
+    Returns:
+        dict: {"success": True, "columns": [...], "rows": [{...}, ...], "row_count": N,
+               "cache": "hit" | "miss" | "bypass", "warnings": [...] (opsional)}
+              columnar: {"success": True, "format": "columnar", "orient": ..., "columns": [...],
+                         "data": [[...], ...], "row_count": N, ...}
+              atau {"error": "..."}
+    """
     # Read-only guard
     if not is_read_only_query(query_string):
         return {"error": "Only SELECT, SHOW, DESCRIBE, and EXPLAIN queries are allowed (read-only mode)"}
+    if result_format not in RESULT_FORMATS:
+        return {"error": f"Unsupported result format: {result_format}"}
+    if orient not in ('rows', 'columns'):
+        return {"error": f"Unsupported orient: {orient}"}
+    
+    normalized = normalize_sql(query_string)
+    ttl = get_saved_query_ttl(service_config, normalized)
+    cache_key = QueryResultCache.make_key(service_config, normalized, params,
+                                          variant=(result_format, orient)) if ttl > 0 else None
+    
+    if cache_key and not force_refresh:
+        cached, age = result_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached, cache="hit", cache_age=round(age, 1))
     
+    db_config = service_config.get("database", {})
+    guard = bool(db_config.get("explain_guard", False))
+    if db_config.get("auto_limit", guard):
+        # +1 agar flag truncated tetap terdeteksi
+        query_string = normalized = apply_auto_limit(normalized, MAX_RESULT_ROWS + 1)
+    
+    warnings = []
     try:
-        parsed = parse_connection_uri(conn_string)
-        
-        if engine == "mysql" or parsed["scheme"] == "mysql":
-            return _execute_mysql(parsed, query_string)
-        elif engine == "postgresql" or parsed["scheme"] == "postgresql":
-            return _execute_postgresql(parsed, query_string)
-        else:
-            return {"error": f"Unsupported database engine: {engine}"}
+        pool = get_pool(service_config, statement_timeout)
+        with pool.connection() as conn:
+            if guard:
+                rejection, warnings = check_query_cost(service_config, pool, conn, query_string, normalized, params)
+                if rejection:
+                    return {"error": rejection, "rejected_by": "cost_guard"}
+            if on_connection:
+                on_connection(pool, conn)
+            try:
+                if pool.engine == "mysql":
+                    result = _execute_mysql(conn, query_string, params, result_format, orient)
+                else:
+                    result = _execute_postgresql(conn, query_string, params, result_format, orient)
+            finally:
+                if on_connection:
+                    on_connection(pool, None)
     except Exception as e:
         return {"error": str(e)}
+    
+    if warnings:
+        result = dict(result, warnings=warnings)
+    if cache_key:
+        result_cache.put(cache_key, result, ttl)
+    return dict(result, cache="miss" if cache_key else "bypass")
+
+
+def _rows_to_objects(columns, raw_rows, engine):
+    """Convert raw rows ke array-of-objects (AG Grid compatible), semua value di-str()."""
+    rows = []
+    for row in raw_rows:
+        row_dict = {}
+        for i, val in enumerate(row):
+            col_name = columns[i] if i < len(columns) else f"col_{i}"
+            if val is None:
+                row_dict[col_name] = None
+            elif isinstance(val, bytes) and engine == "mysql":
+                row_dict[col_name] = val.decode('utf-8', errors='replace')
+            else:
+                row_dict[col_name] = str(val)
+        rows.append(row_dict)
+    return rows
+
+
+def _finite_or_none(val):
+    """NaN / Infinity bukan JSON valid -> None."""
+    return None if isinstance(val, float) and not math.isfinite(val) else val
+
+
+def _columnar_value(val):
+    """Konversi value di kolom bertipe campuran: tipe JSON apa adanya, bytes di-decode, lainnya str()."""
+    if type(val) in JSON_NATIVE_TYPES:
+        return _finite_or_none(val)
+    if isinstance(val, (bytes, bytearray, memoryview)):
+        return bytes(val).decode('utf-8', errors='replace')
+    return str(val)
+
+
+def _column_converter(types):
+    """
+    Pilih konversi satu kali per kolom dari tipe value di kolom (None diabaikan),
+    sehingga semua value dalam satu kolom punya tipe JSON yang sama.
+    DECIMAL/NUMERIC selalu str (presisi utuh). None = kolom disalin apa adanya.
+    """
+    types = types - {type(None)}
+    if types <= {int, bool, str}:
+        return None
+    if types <= {int, bool, float}:
+        return _finite_or_none
+    if Decimal in types:
+        return str
+    return _columnar_value
+
+
+def _rows_to_columnar(columns, raw_rows, orient='rows'):
+    """
+    Format columnar: nama kolom sekali, data sebagai row arrays (orient=rows) atau
+    per-column arrays (orient=columns). Number/bool/null tetap tipe JSON native.
+    Tipe dicek dan konversi dipilih sekali per kolom; kolom yang tidak perlu
+    dikonversi disalin tanpa menyentuh tiap cell.
+    """
+    if not raw_rows:
+        return [] if orient == 'rows' else [[] for _ in columns]
+    
+    converted = []
+    needs_conversion = False
+    for col in zip(*raw_rows):
+        convert = _column_converter(set(map(type, col)))
+        if convert is None:
+            converted.append(col)
+        else:
+            needs_conversion = True
+            converted.append([None if v is None else convert(v) for v in col])
+    
+    if orient == 'columns':
+        return [list(col) for col in converted]
+    if not needs_conversion:
+        return list(map(list, raw_rows))
+    return list(map(list, zip(*converted)))
+
+
+def _build_result(columns, raw_rows, engine, result_format='objects', orient='rows'):
+    """Bangun payload hasil query (array-of-objects default, atau columnar)."""
+    truncated = len(raw_rows) > MAX_RESULT_ROWS
+    raw_rows = raw_rows[:MAX_RESULT_ROWS]
+    
+    if result_format == 'columnar':
+        return {
+            "success": True,
+            "format": "columnar",
+            "orient": orient,
+            "columns": columns,
+            "data": _rows_to_columnar(columns, raw_rows, orient),
+            "row_count": len(raw_rows),
+            "truncated": truncated
+        }
+    
+    rows = _rows_to_objects(columns, raw_rows, engine)
+    return {
+        "success": True,
+        "columns": columns,
+        "rows": rows,
+        "row_count": len(rows),
+        "truncated": truncated
+    }
 
 
-def _execute_mysql(parsed, query_string):
+def _execute_mysql(conn, query_string, params=None, result_format='objects', orient='rows'):
     """Eksekusi query pada MySQL menggunakan pymysql."""
-    try:
-        import pymysql
-    except ImportError:
-        return {"error": "pymysql not installed. Run: pip install pymysql"}
+    with conn.cursor() as cursor:
+        cursor.execute(query_string, params)
+        
+        columns = [desc[0] for desc in cursor.description] if cursor.description else []
+        # Ambil 1 baris ekstra untuk flag truncated (rowcount tidak reliable)
+        raw_rows = cursor.fetchmany(MAX_RESULT_ROWS + 1) if cursor.description else []
+        return _build_result(columns, raw_rows, "mysql", result_format, orient)
+
+
+def _execute_postgresql(conn, query_string, params=None, result_format='objects', orient='rows'):
+    """Eksekusi query pada PostgreSQL menggunakan psycopg2."""
+    with conn.cursor() as cursor:
+        cursor.execute(query_string, params)
+        
+        columns = [desc[0] for desc in cursor.description] if cursor.description else []
+        raw_rows = cursor.fetchmany(MAX_RESULT_ROWS + 1) if cursor.description else []
+        return _build_result(columns, raw_rows, "postgresql", result_format, orient)
+
+
+# --- SERVER-SIDE CURSORS (PAGINATION) ---
+
+def _open_server_cursor(pool, conn, query_string, token, fetch_size, idle_timeout=CURSOR_TTL, scrollable=False):
+    """
+    Jalankan query di server-side cursor pada koneksi pool.
+    PostgreSQL: named cursor dalam transaksi read-only. MySQL: SSCursor (unbuffered).
     
-    conn = None
-    try:
-        conn = pymysql.connect(
-            host=parsed["host"],
-            port=parsed["port"],
-            user=parsed["username"],
-            password=parsed["password"],
-            database=parsed["database"],
-            charset='utf8mb4',
-            cursorclass=pymysql.cursors.Cursor,
-            connect_timeout=5,
-            read_timeout=10
-        )
+    Returns:
+        tuple: (cursor, columns)
+    """
+    if pool.engine == "mysql":
+        import pymysql
+        with conn.cursor() as setup:
+            # Server memutus unbuffered result jika client diam > net_write_timeout
+            setup.execute(f"SET SESSION net_write_timeout = {int(idle_timeout) + 30}")
+        cursor = conn.cursor(pymysql.cursors.SSCursor)
+    else:
+        # Named cursor butuh transaksi (bukan autocommit)
+        conn.set_session(readonly=True, autocommit=False)
+        cursor = conn.cursor(name=f"kiero_{token[:16]}", scrollable=scrollable)
+        cursor.itersize = fetch_size
+    cursor.execute(query_string)
+    columns = [desc[0] for desc in cursor.description] if cursor.description else []
+    return cursor, columns
+
+
+def _close_server_cursor(pool, conn, cursor, exhausted, discard=False):
+    """Tutup server-side cursor dan kembalikan koneksinya ke pool."""
+    # SSCursor.close() membaca semua sisa row; putuskan koneksinya saja
+    if pool.engine == "mysql" and not exhausted:
+        discard = True
+    if not discard:
+        try:
+            cursor.close()
+            conn.rollback()
+        except Exception:
+            discard = True
+    pool.release(conn, discard=discard)
+
+
+class ServerCursor:
+    """Satu server-side cursor yang memegang koneksi pool sampai ditutup / expired."""
+    def __init__(self, token, owner, pool, conn, cursor, columns, page_size):
+        self.token = token
+        self.owner = owner
+        self.pool = pool
+        self.conn = conn
+        self.cursor = cursor
+        self.columns = columns
+        self.page_size = page_size
+        self.position = 0          # jumlah row yang sudah di-fetch dari server
+        self.exhausted = False
+        self.total_rows = None     # diketahui setelah cursor habis
+        self.pages = {}            # page -> rows (cache untuk MySQL yang forward-only)
+        self.last_used = time.monotonic()
+        self.lock = threading.RLock()
+
+    def mark_exhausted(self):
+        if not self.exhausted:
+            self.exhausted = True
+            self.total_rows = self.position
+
+
+class CursorRegistry:
+    """
+    Menyimpan server-side cursor di bawah token berumur pendek.
+    - PostgreSQL: named cursor (scrollable) dalam transaksi read-only
+    - MySQL: SSCursor (unbuffered, forward-only); page yang sudah lewat diambil dari cache
+    Cursor idle > ttl detik ditutup; tiap user maksimal max_per_user cursor
+    (cursor paling lama ditutup saat membuka yang baru).
+    """
+    def __init__(self, ttl=CURSOR_TTL, max_per_user=CURSOR_MAX_PER_USER):
+        self.ttl = ttl
+        self.max_per_user = max_per_user
+        self._cursors = {}
+        self._lock = threading.Lock()
+        self._reaper = None
+
+    def _start_reaper(self):
+        if self._reaper is None:
+            self._reaper = threading.Thread(target=self._reap_loop, name='db-cursor-reaper', daemon=True)
+            self._reaper.start()
+
+    def _reap_loop(self):
+        while True:
+            time.sleep(max(1, self.ttl / 4))
+            self.reap()
+
+    def reap(self):
+        """Tutup semua cursor yang sudah expired."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [c for c in self._cursors.values() if now - c.last_used > self.ttl]
+        for cur in expired:
+            self.close(cur.token)
+
+    def open(self, service_config, query_string, owner, page_size=100):
+        if not is_read_only_query(query_string):
+            return {"error": "Only SELECT, SHOW, DESCRIBE, and EXPLAIN queries are allowed (read-only mode)"}
+        page_size = max(1, min(int(page_size), MAX_RESULT_ROWS))
+        self._start_reaper()
         
-        with conn.cursor() as cursor:
-            cursor.execute(query_string)
-            
-            columns = [desc[0] for desc in cursor.description] if cursor.description else []
-            raw_rows = cursor.fetchmany(500)
-            
-            # Convert to array-of-objects (AG Grid compatible)
-            rows = []
-            for row in raw_rows:
-                row_dict = {}
-                for i, val in enumerate(row):
-                    col_name = columns[i] if i < len(columns) else f"col_{i}"
-                    if val is None:
-                        row_dict[col_name] = None
-                    elif isinstance(val, bytes):
-                        row_dict[col_name] = val.decode('utf-8', errors='replace')
-                    else:
-                        row_dict[col_name] = str(val)
-                rows.append(row_dict)
-            
-            return {
-                "success": True,
-                "columns": columns,
-                "rows": rows,
-                "row_count": len(rows),
-                "truncated": cursor.rowcount > 500 if cursor.rowcount and cursor.rowcount > 0 else False
+        # Batas per user: tutup cursor paling lama milik user ini
+        with self._lock:
+            owned = sorted((c for c in self._cursors.values() if c.owner == owner), key=lambda c: c.last_used)
+        for cur in owned[:max(0, len(owned) - self.max_per_user + 1)]:
+            self.close(cur.token)
+        
+        try:
+            pool = get_pool(service_config, get_statement_timeout(service_config))
+            conn = pool.acquire()
+        except Exception as e:
+            return {"error": str(e)}
+        
+        token = uuid.uuid4().hex
+        try:
+            cursor, columns = _open_server_cursor(pool, conn, query_string, token, page_size,
+                                                  idle_timeout=self.ttl, scrollable=True)
+        except Exception as e:
+            pool.release(conn, discard=True)
+            return {"error": str(e)}
+        
+        cur = ServerCursor(token, owner, pool, conn, cursor, columns, page_size)
+        with self._lock:
+            self._cursors[token] = cur
+        
+        result = self.fetch_page(token, owner, 1)
+        if "error" not in result:
+            result["cursor"] = token
+        return result
+
+    def fetch_page(self, token, owner, page):
+        with self._lock:
+            cur = self._cursors.get(token)
+        if cur is None or cur.owner != owner:
+            return {"error": "Cursor not found or expired"}
+        page = max(1, int(page))
+        
+        with cur.lock:
+            cur.last_used = time.monotonic()
+            try:
+                raw_rows = self._read_page(cur, page)
+            except Exception as e:
+                self.close(token, discard=True)
+                return {"error": str(e)}
+        
+        if raw_rows is None:
+            return {"error": f"Page {page} is no longer available (MySQL cursors are forward-only), re-run the query"}
+        
+        engine = cur.pool.engine
+        rows = _rows_to_objects(cur.columns, raw_rows, engine)
+        has_more = not cur.exhausted or page * cur.page_size < cur.total_rows
+        return {
+            "success": True,
+            "columns": cur.columns,
+            "rows": rows,
+            "row_count": len(rows),
+            "page": page,
+            "page_size": cur.page_size,
+            "has_more": has_more,
+            "truncated": has_more
+        }
+
+    def _read_page(self, cur, page):
+        start = (page - 1) * cur.page_size
+        if not cur.columns:
+            cur.mark_exhausted()
+            return []
+        
+        if cur.pool.engine == "postgresql":
+            # Scrollable named cursor: lompat langsung ke posisi page
+            if start != cur.position:
+                cur.cursor.scroll(start, mode='absolute')
+            rows = cur.cursor.fetchmany(cur.page_size)
+            cur.position = start + len(rows)
+            if len(rows) < cur.page_size:
+                cur.mark_exhausted()
+            return rows
+        
+        # MySQL forward-only
+        if page in cur.pages:
+            return cur.pages[page]
+        if start < cur.position:
+            return None
+        while cur.position <= start and not cur.exhausted:
+            rows = cur.cursor.fetchmany(cur.page_size)
+            current_page = cur.position // cur.page_size + 1
+            cur.position += len(rows)
+            if len(rows) < cur.page_size:
+                cur.mark_exhausted()
+            cur.pages[current_page] = rows
+            # Cache hanya beberapa page terakhir
+            for old in [p for p in cur.pages if p <= current_page - CURSOR_CACHED_PAGES]:
+                del cur.pages[old]
+        return cur.pages.get(page, [])
+
+    def close(self, token, owner=None, discard=False):
+        with self._lock:
+            cur = self._cursors.get(token)
+            if cur is None or (owner is not None and cur.owner != owner):
+                return False
+            del self._cursors[token]
+        
+        with cur.lock:
+            _close_server_cursor(cur.pool, cur.conn, cur.cursor, cur.exhausted, discard)
+        return True
+
+
+cursor_registry = CursorRegistry()
+
+
+# --- SCHEMA METADATA CACHE ---
+
+_PG_SYSTEM_SCHEMAS = "('pg_catalog', 'information_schema')"
+
+_SCHEMA_QUERIES = {
+    "postgresql": {
+        "tables": f"""
+            SELECT n.nspname, c.relname,
+                   CASE c.relkind WHEN 'v' THEN 'VIEW' WHEN 'm' THEN 'MATERIALIZED VIEW'
+                                  WHEN 'f' THEN 'FOREIGN TABLE' ELSE 'BASE TABLE' END,
+                   GREATEST(c.reltuples, 0)::bigint
+            FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE c.relkind IN ('r', 'p', 'v', 'm', 'f')
+              AND n.nspname NOT IN {_PG_SYSTEM_SCHEMAS} AND n.nspname NOT LIKE 'pg_toast%'
+            ORDER BY 1, 2""",
+        "columns": f"""
+            SELECT table_schema, table_name, column_name, data_type, is_nullable = 'YES', column_default
+            FROM information_schema.columns
+            WHERE table_schema NOT IN {_PG_SYSTEM_SCHEMAS}
+            ORDER BY table_schema, table_name, ordinal_position""",
+        "indexes": f"""
+            SELECT n.nspname, t.relname, i.relname, ix.indisunique, ix.indisprimary,
+                   array_agg(a.attname ORDER BY k.ord)
+            FROM pg_index ix
+            JOIN pg_class t ON t.oid = ix.indrelid
+            JOIN pg_class i ON i.oid = ix.indexrelid
+            JOIN pg_namespace n ON n.oid = t.relnamespace
+            CROSS JOIN LATERAL unnest(ix.indkey) WITH ORDINALITY AS k(attnum, ord)
+            LEFT JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = k.attnum
+            WHERE n.nspname NOT IN {_PG_SYSTEM_SCHEMAS} AND n.nspname NOT LIKE 'pg_toast%'
+            GROUP BY 1, 2, 3, 4, 5
+            ORDER BY 1, 2, 3""",
+    },
+    "mysql": {
+        "tables": """
+            SELECT TABLE_SCHEMA, TABLE_NAME, TABLE_TYPE, COALESCE(TABLE_ROWS, 0)
+            FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE()
+            ORDER BY TABLE_NAME""",
+        "columns": """
+            SELECT TABLE_SCHEMA, TABLE_NAME, COLUMN_NAME, COLUMN_TYPE, IS_NULLABLE = 'YES', COLUMN_DEFAULT
+            FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE()
+            ORDER BY TABLE_NAME, ORDINAL_POSITION""",
+        "indexes": """
+            SELECT TABLE_SCHEMA, TABLE_NAME, INDEX_NAME, NON_UNIQUE = 0, INDEX_NAME = 'PRIMARY', COLUMN_NAME
+            FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE()
+            ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX""",
+    },
+}
+
+
+def _text(val):
+    return val.decode('utf-8', errors='replace') if isinstance(val, (bytes, bytearray)) else val
+
+
+def fetch_schema_metadata(pool, conn):
+    """
+    Baca tabel, kolom, index, dan estimasi jumlah row (pg_catalog.reltuples /
+    information_schema.TABLES.TABLE_ROWS) dalam 3 query.
+    """
+    queries = _SCHEMA_QUERIES[pool.engine]
+    tables = OrderedDict()
+    with conn.cursor() as cursor:
+        cursor.execute(queries["tables"])
+        for schema, name, table_type, approx_rows in cursor.fetchall():
+            schema, name = _text(schema), _text(name)
+            # Nama siap pakai di query: MySQL selalu database aktif, PostgreSQL qualify selain public
+            qualified = name if pool.engine == "mysql" or schema == "public" else f"{schema}.{name}"
+            tables[(schema, name)] = {
+                "schema": schema,
+                "name": name,
+                "qualified_name": qualified,
+                "type": _text(table_type),
+                "approx_rows": int(approx_rows or 0),
+                "columns": [],
+                "indexes": []
             }
-    finally:
-        if conn:
-            conn.close()
+        
+        cursor.execute(queries["columns"])
+        for schema, table, column, data_type, nullable, default in cursor.fetchall():
+            table_meta = tables.get((_text(schema), _text(table)))
+            if table_meta is not None:
+                table_meta["columns"].append({
+                    "name": _text(column),
+                    "type": _text(data_type),
+                    "nullable": bool(nullable),
+                    "default": None if default is None else str(_text(default))
+                })
+        
+        cursor.execute(queries["indexes"])
+        mysql_indexes = {}
+        for schema, table, index, unique, primary, columns in cursor.fetchall():
+            table_meta = tables.get((_text(schema), _text(table)))
+            if table_meta is None:
+                continue
+            if pool.engine == "postgresql":
+                # Kolom NULL = index expression
+                table_meta["indexes"].append({
+                    "name": _text(index), "unique": bool(unique), "primary": bool(primary),
+                    "columns": [_text(c) if c is not None else "<expr>" for c in columns]
+                })
+                continue
+            # MySQL: satu row per kolom index, gabungkan
+            key = (_text(schema), _text(table), _text(index))
+            entry = mysql_indexes.get(key)
+            if entry is None:
+                entry = mysql_indexes[key] = {"name": _text(index), "unique": bool(unique),
+                                              "primary": bool(primary), "columns": []}
+                table_meta["indexes"].append(entry)
+            entry["columns"].append(_text(columns) if columns is not None else "<expr>")
+    
+    return list(tables.values())
 
 
-def _execute_postgresql(parsed, query_string):
-    """Eksekusi query pada PostgreSQL menggunakan psycopg2."""
+class SchemaCache:
+    """
+    Cache metadata schema per service (stale-while-revalidate): request pertama
+    membaca langsung dari DB, setelah TTL lewat metadata lama tetap dikembalikan
+    sementara refresh berjalan di background thread (satu refresh per service).
+    """
+    def __init__(self, ttl=SCHEMA_CACHE_TTL):
+        self.ttl = ttl
+        self._entries = {}      # key -> (tables, fetched_at, engine)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(service_config):
+        return (service_config.get("id"), get_connection_string(service_config) or "")
+
+    def _load(self, key, service_config):
+        pool = get_pool(service_config, get_statement_timeout(service_config))
+        with pool.connection() as conn:
+            tables = fetch_schema_metadata(pool, conn)
+        entry = (tables, time.time(), pool.engine)
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    def _refresh_in_background(self, key, service_config):
+        try:
+            self._load(key, service_config)
+        except Exception as e:
+            print(f"[SchemaCache] Refresh failed for {key[0]}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get(self, service_config, force_refresh=False):
+        """
+        Returns:
+            dict: {"success": True, "engine": "mysql" | "postgresql", "tables": [...],
+                   "fetched_at": ts, "age": detik, "refreshing": bool}
+                  atau {"error": "..."}
+        """
+        key = self._key(service_config)
+        ttl = float(service_config.get("database", {}).get("schema_cache_ttl", self.ttl))
+        with self._lock:
+            entry = self._entries.get(key)
+        
+        if entry is None or force_refresh:
+            try:
+                entry = self._load(key, service_config)
+            except Exception as e:
+                return {"error": str(e)}
+        
+        tables, fetched_at, engine = entry
+        age = time.time() - fetched_at
+        refreshing = False
+        if age > ttl:
+            with self._lock:
+                refreshing = True
+                if key not in self._refreshing:
+                    self._refreshing.add(key)
+                    threading.Thread(target=self._refresh_in_background, args=(key, service_config),
+                                     name='db-schema-refresh', daemon=True).start()
+        
+        return {
+            "success": True,
+            "engine": engine,
+            "tables": tables,
+            "table_count": len(tables),
+            "fetched_at": fetched_at,
+            "age": round(age, 1),
+            "refreshing": refreshing
+        }
+
+    def invalidate(self, service_id=None):
+        with self._lock:
+            for key in [k for k in self._entries if service_id is None or k[0] == service_id]:
+                del self._entries[key]
+
+
+schema_cache = SchemaCache()
+
+
+# --- ASYNC QUERY JOBS ---
+
+class QueryJob:
+    """Satu query yang dieksekusi di background; status: queued|running|done|failed|cancelled."""
+    def __init__(self, job_id, owner, service_id, query_string):
+        self.id = job_id
+        self.owner = owner
+        self.service_id = service_id
+        self.query = query_string
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+        self.pool = None
+        self.conn = None
+        self.cancel_requested = False
+        self.finished = threading.Event()
+        self.lock = threading.Lock()
+
+    def to_dict(self, include_result=True):
+        data = {
+            "job_id": self.id,
+            "service_id": self.service_id,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+        if self.started_at:
+            data["elapsed"] = round((self.finished_at or time.time()) - self.started_at, 3)
+        if self.error:
+            data["error"] = self.error
+        if include_result and self.result is not None:
+            data["result"] = self.result
+        return data
+
+
+class QueryJobManager:
+    """
+    Eksekusi query async: submit() langsung mengembalikan job id, client polling
+    status (long-poll dengan wait), dan cancel() menghentikan statement di server.
+    Job yang sudah selesai disimpan result_ttl detik lalu dibuang.
+    """
+    def __init__(self, max_workers=JOB_WORKERS, result_ttl=JOB_RESULT_TTL,
+                 max_active_per_user=JOB_MAX_ACTIVE_PER_USER):
+        self.result_ttl = result_ttl
+        self.max_active_per_user = max_active_per_user
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='db-query-job')
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def _purge_locked(self):
+        now = time.time()
+        for job_id in [j.id for j in self._jobs.values()
+                       if j.finished_at and now - j.finished_at > self.result_ttl]:
+            del self._jobs[job_id]
+
+    def submit(self, service_config, query_string, owner, params=None, force_refresh=False,
+               result_format='objects', orient='rows'):
+        if not is_read_only_query(query_string):
+            return {"error": "Only SELECT, SHOW, DESCRIBE, and EXPLAIN queries are allowed (read-only mode)"}
+        
+        with self._lock:
+            self._purge_locked()
+            active = sum(1 for j in self._jobs.values() if j.owner == owner and not j.finished.is_set())
+            if active >= self.max_active_per_user:
+                return {"error": f"Too many running queries ({active}), wait or cancel one first"}
+            job = QueryJob(uuid.uuid4().hex, owner, service_config.get("id"), query_string)
+            self._jobs[job.id] = job
+        
+        job.future = self._executor.submit(self._run, job, service_config, params, force_refresh,
+                                           result_format, orient)
+        return job.to_dict()
+
+    def _run(self, job, service_config, params, force_refresh, result_format, orient):
+        with job.lock:
+            job.status = "running"
+            job.started_at = time.time()
+        
+        def attach(pool, conn):
+            with job.lock:
+                if conn is not None and job.cancel_requested:
+                    raise RuntimeError("Query cancelled")
+                job.pool, job.conn = pool, conn
+        
+        result = execute_db_query(service_config, job.query, params=params, force_refresh=force_refresh,
+                                  result_format=result_format, orient=orient,
+                                  on_connection=attach,
+                                  statement_timeout=get_statement_timeout(service_config))
+        with job.lock:
+            if job.cancel_requested:
+                job.status = "cancelled"
+            elif "error" in result:
+                job.status = "failed"
+                job.error = result["error"]
+            else:
+                job.status = "done"
+                job.result = result
+            job.finished_at = time.time()
+        job.finished.set()
+
+    def get(self, job_id, owner, wait=0):
+        """Status job; jika wait > 0, tunggu sampai job selesai (maks wait detik)."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or job.owner != owner:
+            return {"error": "Job not found or expired"}
+        if wait > 0:
+            job.finished.wait(wait)
+        return job.to_dict()
+
+    def cancel(self, job_id, owner):
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or job.owner != owner:
+            return {"error": "Job not found or expired"}
+        
+        # Lock job ditahan selama cancel: worker tidak bisa melepas koneksi ke pool
+        # di tengah jalan, jadi cancel tidak pernah mengenai query milik job lain
+        with job.lock:
+            if job.finished.is_set():
+                return job.to_dict(include_result=False)
+            job.cancel_requested = True
+            if job.status == "queued" and job.future.cancel():
+                job.status = "cancelled"
+                job.finished_at = time.time()
+                job.finished.set()
+            elif job.conn is not None:
+                try:
+                    job.pool.cancel(job.conn)
+                except Exception as e:
+                    return {"error": f"Cancel failed: {e}"}
+            return job.to_dict(include_result=False)
+
+
+query_jobs = QueryJobManager()
+
+
+# --- STREAMING EXPORT (CSV / NDJSON) ---
+
+def _export_value(val):
+    """Value untuk export: bytes di-decode, tipe non-JSON (Decimal, datetime, dll) di-str()."""
+    if isinstance(val, memoryview):
+        val = bytes(val)
+    if isinstance(val, bytes):
+        return val.decode('utf-8', errors='replace')
+    return val
+
+
+def export_query(service_config, query_string, fmt='csv'):
+    """
+    Jalankan query di server-side cursor lalu kembalikan generator yang
+    men-stream hasil sebagai CSV/NDJSON per chunk (memory konstan).
+    Generator ditutup (GeneratorExit) saat client disconnect -> cursor & koneksi dilepas.
+    Jika export_max_rows / export_max_bytes tercapai dan masih ada row, baris terakhir
+    adalah penanda: NDJSON {"_truncated": true, ...}, CSV "# truncated: ...".
+    
+    Returns:
+        generator str, atau dict {"error": "..."} jika query gagal dieksekusi
+    """
+    if fmt not in EXPORT_FORMATS:
+        return {"error": f"Unsupported export format: {fmt}"}
+    if not is_read_only_query(query_string):
+        return {"error": "Only SELECT, SHOW, DESCRIBE, and EXPLAIN queries are allowed (read-only mode)"}
+    
+    db_config = service_config.get("database", {})
+    max_rows = int(db_config.get("export_max_rows", EXPORT_MAX_ROWS))
+    max_bytes = int(db_config.get("export_max_bytes", EXPORT_MAX_BYTES))
+    
     try:
-        import psycopg2
-    except ImportError:
-        return {"error": "psycopg2 not installed. Run: pip install psycopg2-binary"}
+        pool = get_pool(service_config)
+        conn = pool.acquire()
+    except Exception as e:
+        return {"error": str(e)}
     
-    conn = None
     try:
-        conn = psycopg2.connect(
-            host=parsed["host"],
-            port=parsed["port"],
-            user=parsed["username"],
-            password=parsed["password"],
-            dbname=parsed["database"],
-            connect_timeout=5
-        )
-        conn.set_session(readonly=True, autocommit=True)
-        
-        with conn.cursor() as cursor:
-            cursor.execute(query_string)
-            
-            columns = [desc[0] for desc in cursor.description] if cursor.description else []
-            raw_rows = cursor.fetchmany(500)
+        cursor, columns = _open_server_cursor(pool, conn, query_string, uuid.uuid4().hex, EXPORT_CHUNK_ROWS)
+    except Exception as e:
+        pool.release(conn, discard=True)
+        return {"error": str(e)}
+    
+    def generate():
+        exhausted = not columns
+        truncated = False
+        sent_rows = 0
+        sent_bytes = 0
+        try:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            if fmt == 'csv':
+                writer.writerow(columns)
             
-            rows = []
-            for row in raw_rows:
-                row_dict = {}
-                for i, val in enumerate(row):
-                    col_name = columns[i] if i < len(columns) else f"col_{i}"
-                    if val is None:
-                        row_dict[col_name] = None
-                    elif isinstance(val, (bytes, memoryview)):
-                        row_dict[col_name] = str(val)
-                    else:
-                        row_dict[col_name] = str(val)
-                rows.append(row_dict)
+            while not exhausted:
+                if sent_bytes >= max_bytes:
+                    # Batas byte tercapai: truncated hanya jika memang masih ada row
+                    exhausted = not cursor.fetchmany(1)
+                    truncated = not exhausted
+                    break
+                remaining = max_rows - sent_rows
+                # +1 row agar hasil yang tepat max_rows tidak dianggap terpotong
+                limit = min(EXPORT_CHUNK_ROWS, remaining + 1)
+                rows = cursor.fetchmany(limit)
+                exhausted = len(rows) < limit
+                if len(rows) > remaining:
+                    rows = rows[:remaining]
+                    truncated = True
+                if fmt == 'csv':
+                    writer.writerows([['' if v is None else _export_value(v) for v in row] for row in rows])
+                else:
+                    for row in rows:
+                        buffer.write(json.dumps(dict(zip(columns, map(_export_value, row))), default=str))
+                        buffer.write('\n')
+                sent_rows += len(rows)
+                
+                chunk = buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                sent_bytes += len(chunk)
+                if chunk:
+                    yield chunk
+                if truncated:
+                    break
             
-            return {
-                "success": True,
-                "columns": columns,
-                "rows": rows,
-                "row_count": len(rows),
-                "truncated": cursor.rowcount > 500 if cursor.rowcount and cursor.rowcount > 0 else False
-            }
-    finally:
-        if conn:
-            conn.close()
+            if fmt == 'csv' and not columns:
+                yield buffer.getvalue()
+            if truncated:
+                # Batas export tercapai, beri tanda di baris terakhir
+                if fmt == 'ndjson':
+                    yield json.dumps({"_truncated": True, "rows": sent_rows, "bytes": sent_bytes}) + '\n'
+                else:
+                    writer.writerow([f"# truncated: export limit reached after {sent_rows} rows ({sent_bytes} bytes)"])
+                    yield buffer.getvalue()
+        finally:
+            _close_server_cursor(pool, conn, cursor, exhausted)
+    
+    return generate()
@@ -0,0 +1,188 @@
+"""
+dir_listing.py — Listing direktori untuk file browser KieroOPS
+Hasil os.scandir per direktori di-cache (key: path, valid selama inode/mtime
+direktori tidak berubah) dan sudah terurut, sehingga request berikutnya dan
+halaman selanjutnya tidak scan/sort ulang. Pagination memakai cursor berbasis
+sort key (bukan offset) agar stabil walau ada file baru di direktori.
+Mode recursive memakai cache per direktori yang sama, jadi subtree yang
+belum berubah tidak di-scan ulang.
+mtime direktori tidak berubah saat file di dalamnya di-append (log aktif), jadi
+listing juga di-scan ulang setelah LISTING_TTL detik, dan item di halaman yang
+dikembalikan di-stat ulang agar size/modified selalu terkini.
+"""
+
+import os
+import time
+import json
+import base64
+import bisect
+import threading
+from collections import OrderedDict
+
+LISTING_CACHE_MAX_ENTRIES = 500000   # total item di semua listing yang di-cache
+LISTING_TTL = 5.0
+LISTING_PAGE_SIZE = 500
+LISTING_MAX_PAGE_SIZE = 5000
+RECURSIVE_MAX_DEPTH = 8
+RECURSIVE_MAX_ENTRIES = 20000
+
+SORT_KEYS = {
+    # Direktori dulu, lalu nama (case-insensitive)
+    'name': lambda item: (not item['is_dir'], item['name'].lower(), item['name']),
+    # Direktori dulu, lalu file terbaru
+    'mtime': lambda item: (not item['is_dir'], -item['modified'], item['name'])
+}
+
+
+def default_skip(name):
+    """Entry yang disembunyikan dari browser: file hidden dan node_modules."""
+    return name.startswith('.') or name == 'node_modules'
+
+
+def skip_hidden(name):
+    """Hanya entry hidden (mis. .index milik log search) yang disembunyikan."""
+    return name.startswith('.')
+
+
+class DirectoryListingCache:
+    def __init__(self, max_entries=LISTING_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._listings = OrderedDict()  # (path, sort, skip) -> (signature, items, keys, scanned_at)
+        self._total = 0
+
+    def _scan(self, path, skip):
+        items = []
+        with os.scandir(path) as it:
+            for entry in it:
+                if skip and skip(entry.name):
+                    continue
+                try:
+                    # DirEntry menyimpan hasil is_dir()/stat(), cukup satu syscall per entry
+                    is_dir = entry.is_dir()
+                    st = entry.stat()
+                except OSError:
+                    continue
+                items.append({
+                    'name': entry.name,
+                    'path': entry.path,
+                    'is_dir': is_dir,
+                    'size': 0 if is_dir else st.st_size,
+                    'modified': st.st_mtime
+                })
+        return items
+
+    def listing(self, path, sort='name', skip=default_skip):
+        """
+        Isi direktori yang sudah terurut (list dict, dipakai bersama: jangan dimutasi).
+
+        Returns:
+            tuple: (items, keys) — keys = sort key per item untuk bisect cursor
+        """
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        signature = (st.st_ino, st.st_mtime_ns)
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unsupported sort: {sort}")
+        cache_key = (path, sort, skip)
+
+        with self._lock:
+            cached = self._listings.get(cache_key)
+            if cached and cached[0] == signature and time.monotonic() - cached[3] < LISTING_TTL:
+                self._listings.move_to_end(cache_key)
+                return cached[1], cached[2]
+
+        sort_key = SORT_KEYS[sort]
+        scanned_at = time.monotonic()
+        items = self._scan(path, skip)
+        items.sort(key=sort_key)
+        keys = [sort_key(item) for item in items]
+
+        with self._lock:
+            old = self._listings.pop(cache_key, None)
+            if old:
+                self._total -= len(old[1])
+            self._listings[cache_key] = (signature, items, keys, scanned_at)
+            self._total += len(items)
+            while self._total > self.max_entries and len(self._listings) > 1:
+                _, (_, evicted, _, _) = self._listings.popitem(last=False)
+                self._total -= len(evicted)
+        return items, keys
+
+    def page(self, path, cursor=None, limit=LISTING_PAGE_SIZE, sort='name', skip=default_skip):
+        """
+        Satu halaman listing mulai setelah `cursor`.
+
+        Returns:
+            dict: {"items": [...], "total": N, "next_cursor": str | None}
+        """
+        items, keys = self.listing(path, sort, skip)
+        limit = max(1, min(int(limit), LISTING_MAX_PAGE_SIZE))
+        start = 0
+        if cursor:
+            try:
+                start = bisect.bisect_right(keys, decode_cursor(cursor))
+            except TypeError:
+                raise ValueError("Cursor does not match the requested sort order")
+        page = [_restat(item) for item in items[start:start + limit]]
+        has_more = start + limit < len(items)
+        return {
+            "items": page,
+            "total": len(items),
+            "next_cursor": encode_cursor(keys[start + limit - 1]) if has_more else None
+        }
+
+    def walk(self, path, max_depth=RECURSIVE_MAX_DEPTH, max_entries=RECURSIVE_MAX_ENTRIES,
+             sort='name', skip=default_skip):
+        """
+        Index recursive (depth-first, urutan sama dengan tree) dari listing per direktori
+        yang di-cache. Setiap item diberi 'depth'.
+
+        Returns:
+            tuple: (items, truncated)
+        """
+        items, _ = self.listing(path, sort, skip)
+        result = []
+        stack = [(iter(items), 0)]
+        while stack:
+            entries, depth = stack[-1]
+            item = next(entries, None)
+            if item is None:
+                stack.pop()
+                continue
+            if len(result) >= max_entries:
+                return result, True
+            result.append(dict(item, depth=depth))
+            if item['is_dir'] and depth + 1 < max_depth:
+                try:
+                    children, _ = self.listing(item['path'], sort, skip)
+                except OSError:
+                    continue
+                stack.append((iter(children), depth + 1))
+        return result, False
+
+
+def _restat(item):
+    """Salinan item dengan size/modified terkini (file bisa tumbuh tanpa mengubah mtime direktori)."""
+    if item['is_dir']:
+        return item
+    try:
+        st = os.stat(item['path'])
+    except OSError:
+        return item
+    return dict(item, size=st.st_size, modified=st.st_mtime)
+
+
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(key).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return (bool(key[0]),) + tuple(key[1:])
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+listing_cache = DirectoryListingCache()
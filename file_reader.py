@@ -0,0 +1,152 @@
+"""
+file_reader.py — Pembacaan file per window untuk file viewer KieroOPS
+File besar tidak pernah dibaca utuh: viewer mengambil rentang baris atau byte
+lewat mmap. Posisi baris dicari dengan index sparse (offset byte + nomor
+baris setiap LINE_INDEX_BLOCK byte) yang di-cache per file dan dibangun
+dengan bytes.count per blok, bukan loop per baris. File biner dideteksi dari
+sample awal dan tidak di-decode.
+"""
+
+import os
+import mmap
+import bisect
+import threading
+from collections import OrderedDict
+
+LINE_INDEX_BLOCK = 64 * 1024
+LINE_INDEX_MAX_FILES = 64
+BINARY_SAMPLE_SIZE = 8192
+MAX_WINDOW_LINES = 5000
+MAX_WINDOW_BYTES = 4 * 1024 * 1024
+
+# Karakter kontrol yang wajar di file teks: \t \n \f \r \x1b
+_TEXT_CONTROL = {7, 8, 9, 10, 12, 13, 27}
+
+
+def is_binary(sample):
+    """Heuristik: ada NUL byte, atau >30% karakter kontrol non-teks di sample."""
+    if not sample:
+        return False
+    if b'\0' in sample:
+        return True
+    control = sum(1 for byte in sample if byte < 32 and byte not in _TEXT_CONTROL)
+    return control / len(sample) > 0.3
+
+
+class LineIndex:
+    """Index sparse: block_lines[i] = jumlah newline sebelum byte i * LINE_INDEX_BLOCK."""
+
+    def __init__(self, mm, size):
+        self.size = size
+        self.block_lines = [0]
+        lines = 0
+        for start in range(0, size, LINE_INDEX_BLOCK):
+            lines += mm[start:start + LINE_INDEX_BLOCK].count(b'\n')
+            self.block_lines.append(lines)
+        self.newlines = lines
+        ends_with_newline = size == 0 or mm[size - 1:size] == b'\n'
+        # Baris terakhir tanpa newline tetap dihitung
+        self.total_lines = lines + (0 if ends_with_newline else 1)
+
+    def line_offset(self, mm, line):
+        """Offset byte awal baris ke-`line` (0-based), atau size jika di luar file."""
+        if line <= 0:
+            return 0
+        if line > self.newlines:
+            return self.size
+        # Blok terakhir yang dimulai sebelum newline ke-`line`
+        block = bisect.bisect_left(self.block_lines, line) - 1
+        pos = block * LINE_INDEX_BLOCK
+        remaining = line - self.block_lines[block]
+        while remaining:
+            pos = mm.find(b'\n', pos) + 1
+            remaining -= 1
+        return pos
+
+
+_indexes = OrderedDict()   # abspath -> (signature, LineIndex)
+_indexes_lock = threading.Lock()
+
+
+def _get_line_index(path, st, mm):
+    key = os.path.abspath(path)
+    signature = (st.st_ino, st.st_size, st.st_mtime_ns)
+    with _indexes_lock:
+        cached = _indexes.get(key)
+        if cached and cached[0] == signature:
+            _indexes.move_to_end(key)
+            return cached[1]
+    index = LineIndex(mm, st.st_size)
+    with _indexes_lock:
+        _indexes[key] = (signature, index)
+        _indexes.move_to_end(key)
+        while len(_indexes) > LINE_INDEX_MAX_FILES:
+            _indexes.popitem(last=False)
+    return index
+
+
+def read_window(path, start_line=None, line_count=None, offset=None, length=None):
+    """
+    Baca sebagian file: rentang baris (start_line 1-based + line_count) atau
+    rentang byte (offset + length, dipotong ke batas baris terdekat).
+
+    Returns:
+        dict: {"content", "binary", "size", "total_lines", "start_line", "end_line",
+               "offset", "next_offset", "partial"}
+    """
+    with open(path, 'rb') as f:
+        st = os.fstat(f.fileno())
+        size = st.st_size
+        result = {"size": size, "binary": False, "content": "", "total_lines": 0,
+                  "start_line": 1, "end_line": 0, "offset": 0, "next_offset": 0, "partial": False}
+        if size == 0:
+            return result
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if is_binary(mm[:BINARY_SAMPLE_SIZE]):
+                result.update(binary=True, partial=size > 0)
+                return result
+
+            index = _get_line_index(path, st, mm)
+            result["total_lines"] = index.total_lines
+
+            if offset is not None:
+                # Byte range: mulai di awal baris, akhiri di newline terakhir dalam window
+                start = min(max(int(offset), 0), size)
+                if start > 0:
+                    start = mm.rfind(b'\n', 0, start) + 1
+                end = min(start + min(int(length or MAX_WINDOW_BYTES), MAX_WINDOW_BYTES), size)
+                if end < size:
+                    cut = mm.rfind(b'\n', start, end)
+                    end = cut + 1 if cut >= 0 else end
+                first_line = _line_at(index, mm, start)
+                data = mm[start:end]
+                last_line = first_line + data.count(b'\n') - (1 if data.endswith(b'\n') else 0)
+            else:
+                first_line = max(int(start_line or 1), 1)
+                count = max(1, min(int(line_count or MAX_WINDOW_LINES), MAX_WINDOW_LINES))
+                start = index.line_offset(mm, first_line - 1)
+                end = index.line_offset(mm, first_line - 1 + count)
+                if end - start > MAX_WINDOW_BYTES:
+                    # Baris sangat panjang (mis. bundle minified): batasi per byte
+                    end = start + MAX_WINDOW_BYTES
+                data = mm[start:end]
+                # Baris terakhir yang terpotong tetap dihitung (sisanya dilewati window berikutnya)
+                last_line = first_line + data.count(b'\n') - (1 if data.endswith(b'\n') else 0)
+
+    result.update(
+        content=data.decode('utf-8', errors='replace'),
+        start_line=first_line,
+        end_line=last_line,
+        offset=start,
+        next_offset=end,
+        partial=start > 0 or end < size
+    )
+    return result
+
+
+def _line_at(index, mm, offset):
+    """Nomor baris (1-based) pada offset byte, memakai index blok + count sisa."""
+    block = offset // LINE_INDEX_BLOCK
+    block_start = block * LINE_INDEX_BLOCK
+    return index.block_lines[block] + mm[block_start:offset].count(b'\n') + 1
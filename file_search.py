@@ -0,0 +1,341 @@
+"""
+file_search.py — Pencarian file di web directory service untuk KieroOPS
+Index daftar file per web directory di-update secara incremental: setiap
+direktori hanya di-scan ulang jika inode/mtime direktori atau .gitignore-nya
+berubah. Pengecualian sama dengan file browser (hidden, node_modules) plus
+aturan .gitignore (nested, negation, pattern berakar, '**').
+- search_filenames: fuzzy match (subsequence) pada path relatif
+- search_content: regex per baris, file biner dan file besar dilewati,
+  literal wajib dari pattern dipakai untuk menyaring file sebelum decode
+"""
+
+import os
+import re
+import time
+import fnmatch
+import threading
+from collections import OrderedDict
+
+from dir_listing import default_skip
+from file_reader import is_binary, BINARY_SAMPLE_SIZE
+from log_search import required_literals
+
+INDEX_REFRESH_INTERVAL = 2.0
+INDEX_MAX_FILES = 200000
+BINARY_CACHE_MAX_ENTRIES = 50000
+CONTENT_MAX_FILE_BYTES = 5 * 1024 * 1024
+CONTENT_MAX_LINE_CHARS = 300
+SEPARATORS = '/_-. '
+
+
+# --- .gitignore ---
+
+def _translate_glob(pattern):
+    """Glob gitignore -> regex ('**' lintas direktori, '*' dan '?' tidak melewati '/')."""
+    regex, i = '', 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if pattern.startswith('**/', i):
+            regex += '(?:.*/)?'
+            i += 3
+            continue
+        if pattern.startswith('**', i):
+            regex += '.*'
+            i += 2
+            continue
+        if ch == '*':
+            regex += '[^/]*'
+        elif ch == '?':
+            regex += '[^/]'
+        elif ch == '[':
+            end = pattern.find(']', i + 1)
+            if end == -1:
+                regex += re.escape(ch)
+            else:
+                body = pattern[i + 1:end].replace('\\', '\\\\')
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                regex += f'[{body}]'
+                i = end
+        elif ch == '\\' and i + 1 < len(pattern):
+            regex += re.escape(pattern[i + 1])
+            i += 1
+        else:
+            regex += re.escape(ch)
+        i += 1
+    return regex
+
+
+def parse_gitignore(text, base):
+    """
+    Returns:
+        list: [(compiled_regex, negate, dir_only, base_rel_dir)] sesuai urutan file
+    """
+    rules = []
+    for raw in text.splitlines():
+        line = raw.rstrip()
+        if not line or line.startswith('#'):
+            continue
+        negate = line.startswith('!')
+        if negate:
+            line = line[1:]
+        dir_only = line.endswith('/')
+        line = line.rstrip('/')
+        if not line:
+            continue
+        # Pattern dengan '/' di tengah/awal berakar di direktori .gitignore
+        anchored = '/' in line
+        line = line.lstrip('/')
+        prefix = '' if anchored else '(?:.*/)?'
+        rules.append((re.compile(f'^{prefix}{_translate_glob(line)}$'), negate, dir_only, base))
+    return rules
+
+
+def is_ignored(rules, rel_path, is_dir):
+    """Aturan terakhir yang cocok menentukan (negation membatalkan ignore)."""
+    ignored = False
+    for regex, negate, dir_only, base in rules:
+        if dir_only and not is_dir:
+            continue
+        if base:
+            if not rel_path.startswith(base + '/'):
+                continue
+            path = rel_path[len(base) + 1:]
+        else:
+            path = rel_path
+        if regex.match(path):
+            ignored = not negate
+    return ignored
+
+
+# --- FILE INDEX ---
+
+class WebFileIndex:
+    """Daftar file (path relatif, size, mtime) di bawah root, di-refresh per direktori."""
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self._dirs = {}           # rel_dir -> (signature, inherited_rules, files, subdirs, rules)
+        self._files = []          # [(rel_path, size, mtime)]
+        self._binary = OrderedDict()  # rel_path -> (mtime, is_binary), LRU
+        self._binary_lock = threading.Lock()
+        self._refreshed_at = float('-inf')
+        self._lock = threading.Lock()
+        self.truncated = False
+
+    def _dir_signature(self, abs_dir):
+        st = os.stat(abs_dir)
+        try:
+            gitignore_mtime = os.stat(os.path.join(abs_dir, '.gitignore')).st_mtime_ns
+        except OSError:
+            gitignore_mtime = None
+        return (st.st_ino, st.st_mtime_ns, gitignore_mtime)
+
+    def _scan_dir(self, abs_dir, rel_dir, inherited):
+        rules = list(inherited)
+        gitignore = os.path.join(abs_dir, '.gitignore')
+        if os.path.isfile(gitignore):
+            with open(gitignore, 'r', encoding='utf-8', errors='ignore') as f:
+                rules += parse_gitignore(f.read(), rel_dir)
+
+        files, subdirs = [], []
+        with os.scandir(abs_dir) as it:
+            for entry in it:
+                if default_skip(entry.name):
+                    continue
+                rel_path = f'{rel_dir}/{entry.name}' if rel_dir else entry.name
+                try:
+                    # Symlink ke direktori tidak diikuti (hindari loop)
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    if is_ignored(rules, rel_path, is_dir):
+                        continue
+                    if is_dir:
+                        subdirs.append(rel_path)
+                    elif entry.is_file():
+                        st = entry.stat()
+                        files.append((rel_path, st.st_size, st.st_mtime))
+                except OSError:
+                    continue
+        return files, subdirs, tuple(rules)
+
+    def refresh(self, force=False):
+        """Walk root; direktori yang signature-nya sama memakai hasil scan sebelumnya."""
+        with self._lock:
+            if not force and time.monotonic() - self._refreshed_at < INDEX_REFRESH_INTERVAL:
+                return
+            dirs, all_files = {}, []
+            truncated = False
+            stack = [('', ())]
+            while stack:
+                rel_dir, inherited = stack.pop()
+                abs_dir = os.path.join(self.root, rel_dir) if rel_dir else self.root
+                try:
+                    signature = self._dir_signature(abs_dir)
+                except OSError:
+                    continue
+                cached = self._dirs.get(rel_dir)
+                if cached and cached[0] == signature and cached[1] == inherited:
+                    entry = cached
+                else:
+                    try:
+                        files, subdirs, rules = self._scan_dir(abs_dir, rel_dir, inherited)
+                    except OSError:
+                        continue
+                    entry = (signature, inherited, files, subdirs, rules)
+                dirs[rel_dir] = entry
+                all_files.extend(entry[2])
+                if len(all_files) >= INDEX_MAX_FILES:
+                    truncated = True
+                    break
+                stack.extend((sub, entry[4]) for sub in reversed(entry[3]))
+
+            self._dirs = dirs
+            self._files = sorted(all_files[:INDEX_MAX_FILES])
+            self.truncated = truncated
+            self._refreshed_at = time.monotonic()
+
+    def files(self):
+        self.refresh()
+        return self._files
+
+    def is_binary_file(self, rel_path, mtime, sample):
+        with self._binary_lock:
+            cached = self._binary.get(rel_path)
+            if cached and cached[0] == mtime:
+                self._binary.move_to_end(rel_path)
+                return cached[1]
+        result = is_binary(sample)
+        with self._binary_lock:
+            self._binary[rel_path] = (mtime, result)
+            self._binary.move_to_end(rel_path)
+            while len(self._binary) > BINARY_CACHE_MAX_ENTRIES:
+                self._binary.popitem(last=False)
+        return result
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_web_index(root):
+    root = os.path.abspath(root)
+    with _indexes_lock:
+        index = _indexes.get(root)
+        if index is None:
+            index = _indexes[root] = WebFileIndex(root)
+        return index
+
+
+# --- SEARCH ---
+
+def fuzzy_score(query, path):
+    """
+    Skor fuzzy (subsequence, case-insensitive) atau None jika tidak cocok.
+    Bonus untuk karakter berurutan, awal kata, dan match di nama file.
+    """
+    lower = path.lower()
+    base_start = lower.rfind('/') + 1
+    if query in lower[base_start:]:
+        # Substring utuh di nama file: paling relevan, nama lebih pendek lebih baik
+        return 1000 - (len(lower) - base_start) + (50 if lower[base_start:].startswith(query) else 0)
+
+    score, pos, previous = 0, 0, -2
+    for ch in query:
+        found = lower.find(ch, pos)
+        if found == -1:
+            return None
+        score += 1
+        if found == previous + 1:
+            score += 5
+        if found == 0 or lower[found - 1] in SEPARATORS:
+            score += 8
+        if found >= base_start:
+            score += 2
+        score -= min(found - pos, 10) * 0.1
+        previous, pos = found, found + 1
+    return score
+
+
+def search_filenames(root, query, limit=50):
+    """
+    Returns:
+        dict: {"matches": [{path, size, modified, score}], "files_indexed", "truncated"}
+    """
+    index = get_web_index(root)
+    query = query.lower().replace('\\', '/')
+    scored = []
+    for rel_path, size, mtime in index.files():
+        score = fuzzy_score(query, rel_path)
+        if score is not None:
+            scored.append((-score, len(rel_path), rel_path, size, mtime))
+    scored.sort()
+    return {
+        "matches": [{"path": path, "size": size, "modified": mtime, "score": round(-neg, 1)}
+                    for neg, _, path, size, mtime in scored[:limit]],
+        "total_matches": len(scored),
+        "files_indexed": len(index.files()),
+        "truncated": index.truncated
+    }
+
+
+def search_content(root, pattern, ignore_case=True, glob=None, limit=500):
+    """
+    Cari regex per baris di semua file teks yang terindex.
+
+    Returns:
+        dict: {"matches": [{path, line, column, text}], "files_scanned", "files_skipped",
+               "files_prefiltered" (teks tapi tidak memuat literal wajib, tidak di-decode), "truncated"}
+    """
+    index = get_web_index(root)
+    regex = re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+    # Literal non-ASCII tidak aman dibandingkan dengan bytes.lower()
+    literals = [lit.encode('ascii') for lit in required_literals(pattern) if lit.isascii()]
+    matches = []
+    stats = {"files_scanned": 0, "files_skipped": 0, "files_prefiltered": 0}
+    truncated = False
+
+    for rel_path, size, mtime in index.files():
+        if glob and not fnmatch.fnmatch(rel_path, glob) and not fnmatch.fnmatch(os.path.basename(rel_path), glob):
+            continue
+        if size > CONTENT_MAX_FILE_BYTES or size == 0:
+            stats["files_skipped"] += 1
+            continue
+        try:
+            with open(os.path.join(index.root, rel_path), 'rb') as f:
+                data = f.read()
+        except OSError:
+            continue
+        if index.is_binary_file(rel_path, mtime, data[:BINARY_SAMPLE_SIZE]):
+            stats["files_skipped"] += 1
+            continue
+        stats["files_scanned"] += 1
+
+        haystack = data.lower()
+        if any(lit not in haystack for lit in literals):
+            stats["files_prefiltered"] += 1
+            continue
+
+        text = data.decode('utf-8', errors='replace')
+        line_no, line_pos = 1, 0
+        last_line_start = -1
+        for match in regex.finditer(text):
+            line_start = text.rfind('\n', 0, match.start()) + 1
+            if line_start == last_line_start:
+                continue
+            line_no += text.count('\n', line_pos, line_start)
+            line_pos = last_line_start = line_start
+            line_end = text.find('\n', match.end())
+            line = text[line_start:line_end if line_end != -1 else len(text)]
+            matches.append({
+                "path": rel_path,
+                "line": line_no,
+                "column": match.start() - line_start + 1,
+                "text": line[:CONTENT_MAX_LINE_CHARS]
+            })
+            if len(matches) >= limit:
+                truncated = True
+                break
+        if truncated:
+            break
+
+    return dict(matches=matches, truncated=truncated or index.truncated, **stats)
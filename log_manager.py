@@ -1,21 +1,72 @@
 import os
 import sys
 import argparse
+import signal
 import subprocess
 import threading
 import time
 import shutil
 import zipfile
+import gzip
+import re
+import codecs
+import tempfile
+from collections import deque
 from datetime import datetime, timedelta
 
+from log_search import remove_file_index
+
+ARCHIVE_CHUNK_SIZE = 1024 * 1024
+PIPE_READ_SIZE = 64 * 1024
+# Batas waktu menunggu child keluar & buffer terkuras saat shutdown (di bawah stop_timeout supervisor)
+DRAIN_TIMEOUT = 5.0
+# Baris tanpa newline yang lebih panjang dari ini tetap ditulis (dipotong)
+MAX_PARTIAL_LINE = 1024 * 1024
+OVERFLOW_POLICIES = ('block', 'drop_oldest', 'spill')
+ARCHIVE_EXTENSIONS = {'zip': '.zip', 'gzip': '.gz', 'zstd': '.zst'}
+
+# YYYY-MM-DD.log (harian) atau YYYY-MM-DD.N.log (segment yang sudah ditutup)
+LOG_FILENAME_RE = re.compile(r'^(\d{4}-\d{2}-\d{2})(?:\.(\d+))?\.log$')
+
+def positive_int(value):
+    """argparse type: integer >= 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
 def get_today_str():
     return datetime.now().strftime('%Y-%m-%d')
 
+def get_next_midnight_ts():
+    """Timestamp pergantian hari berikutnya (dihitung sekali per rotasi)."""
+    tomorrow = datetime.now() + timedelta(days=1)
+    return tomorrow.replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+
 class LogRotator:
-    def __init__(self, log_dir, service_name):
+    def __init__(self, log_dir, service_name, flush_bytes=64 * 1024, flush_interval=1.0,
+                 max_segment_bytes=0, archive_format='zip', archive_after_days=7):
         self.log_dir = log_dir
         self.service_name = service_name
         self.current_date = get_today_str()
+        self.next_rotation_ts = get_next_midnight_ts()
+        
+        # Buffer: flush jika ukuran >= flush_bytes atau sudah lewat flush_interval detik
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._buffered_bytes = 0
+        self._last_flush = time.monotonic()
+        self._handles = {}
+        self._lock = threading.Lock()
+        
+        # Rotasi berdasarkan ukuran (0 = nonaktif) & format arsip
+        if archive_format not in ARCHIVE_EXTENSIONS:
+            raise ValueError(f"Unsupported archive format: {archive_format}")
+        self.max_segment_bytes = max_segment_bytes
+        self.archive_format = archive_format
+        self.archive_after_days = archive_after_days
+        self.archive_event = threading.Event()
         
         # Ensure log dir exists
         if not os.path.exists(self.log_dir):
@@ -24,6 +75,10 @@ class LogRotator:
         self.archive_dir = os.path.join(self.log_dir, 'archive')
         if not os.path.exists(self.archive_dir):
             os.makedirs(self.archive_dir)
+        
+        # current.log = pointer (symlink/hardlink) ke file harian aktif
+        self.current_link_mode = None
+        self.link_current_log()
 
     def get_log_file_path(self):
         return os.path.join(self.log_dir, f"{self.current_date}.log")
@@ -31,77 +86,402 @@ class LogRotator:
     def get_current_log_path(self):
         return os.path.join(self.log_dir, "current.log")
 
+    def link_current_log(self):
+        """
+        Arahkan current.log ke file harian aktif, sehingga setiap byte hanya
+        ditulis sekali. Link dibuat dengan nama sementara lalu di-swap atomik
+        (os.replace). Urutan: symlink -> hard link -> fallback dual-write.
+        """
+        daily_path = self.get_log_file_path()
+        current_path = self.get_current_log_path()
+        tmp_path = current_path + ".tmp"
+        
+        # File harian harus ada dulu (wajib untuk hard link)
+        open(daily_path, 'a', encoding='utf-8').close()
+        
+        for mode in ('symlink', 'hardlink'):
+            try:
+                if os.path.lexists(tmp_path):
+                    os.remove(tmp_path)
+                if mode == 'symlink':
+                    os.symlink(os.path.basename(daily_path), tmp_path)
+                else:
+                    os.link(daily_path, tmp_path)
+                os.replace(tmp_path, current_path)
+                self.current_link_mode = mode
+                return
+            except (OSError, NotImplementedError, AttributeError):
+                continue
+        
+        # Filesystem tidak mendukung link: tulis ke current.log terpisah (cara lama)
+        print("[LogManager] Cannot link current.log, falling back to dual-write")
+        if os.path.islink(current_path):
+            os.remove(current_path)
+        self.current_link_mode = 'copy'
+
     def check_rotation(self):
         """Check if date has changed, if so update current_date."""
+        if time.time() < self.next_rotation_ts:
+            return
         today = get_today_str()
         if today != self.current_date:
             print(f"[LogManager] Rotating log from {self.current_date} to {today}")
+            # Sisa buffer milik hari lama ditulis ke file hari lama
+            self._flush_locked()
+            self._close_handles()
             self.current_date = today
-            # Kosongkan current.log saat ganti hari (opsional, atau biarkan append)
-            # open(self.get_current_log_path(), 'w').close() 
+            # current.log otomatis "kosong" karena menunjuk ke file hari baru
+            self.link_current_log()
+        self.next_rotation_ts = get_next_midnight_ts()
 
     def write(self, content):
-        """Write content to both daily log and current.log"""
-        self.check_rotation()
+        """Buffer content, flushed to the daily log (current.log points at it) by size/time threshold."""
+        with self._lock:
+            self.check_rotation()
+            self._buffer.append(content)
+            self._buffered_bytes += len(content.encode('utf-8'))
+            if self._buffered_bytes >= self.flush_bytes or \
+               time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush_locked()
+
+    def flush(self):
+        """Flush buffer ke file (dipanggil flusher thread & saat shutdown)."""
+        with self._lock:
+            self.check_rotation()
+            self._flush_locked()
+
+    def flush_if_due(self):
+        """Flush hanya jika buffer sudah melewati flush_interval."""
+        with self._lock:
+            if self._buffer and time.monotonic() - self._last_flush >= self.flush_interval:
+                self.check_rotation()
+                self._flush_locked()
+
+    def close(self):
+        """Flush sisa buffer dan tutup semua file handle."""
+        with self._lock:
+            self._flush_locked()
+            self._close_handles()
+
+    def _get_handle(self, path):
+        f = self._handles.get(path)
+        if f is None:
+            f = open(path, 'a', encoding='utf-8')
+            self._handles[path] = f
+        return f
+
+    def _close_handles(self):
+        for f in self._handles.values():
+            try:
+                f.close()
+            except Exception as e:
+                print(f"Error closing log file: {e}")
+        self._handles = {}
+
+    def _flush_locked(self):
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        data = ''.join(self._buffer)
+        self._buffer = []
+        self._buffered_bytes = 0
+        if not self.max_segment_bytes:
+            self._write_locked(data)
+            return
         
+        # Batch dipecah di batas baris sehingga segment tidak melewati max_segment_bytes
+        pending = data.encode('utf-8')
+        while pending:
+            room = self.max_segment_bytes - self._segment_size()
+            if len(pending) <= room:
+                cut = len(pending)
+            else:
+                cut = pending.rfind(b'\n', 0, max(room, 0)) + 1
+            if cut == 0:
+                if room < self.max_segment_bytes and self._roll_segment():
+                    continue
+                # Segment kosong tapi satu baris lebih panjang dari max_segment_bytes: tulis utuh
+                cut = pending.find(b'\n') + 1 or len(pending)
+            self._write_locked(pending[:cut].decode('utf-8', errors='replace'))
+            pending = pending[cut:]
+            if self._segment_size() >= self.max_segment_bytes and not self._roll_segment():
+                self._write_locked(pending.decode('utf-8', errors='replace'))
+                return
+
+    def _write_locked(self, data):
         # 1. Write to Daily Log
-        daily_path = self.get_log_file_path()
+        # 2. Dashboard reads 'current.log', which is a link to the daily log.
+        #    Only write it separately when linking is not supported.
+        targets = [("daily", self.get_log_file_path())]
+        if self.current_link_mode == 'copy':
+            targets.append(("current", self.get_current_log_path()))
+        for label, path in targets:
+            try:
+                f = self._get_handle(path)
+                f.write(data)
+                f.flush()
+            except Exception as e:
+                print(f"Error writing to {label} log: {e}")
+                self._handles.pop(path, None)
+
+    def _segment_size(self):
         try:
-            with open(daily_path, 'a', encoding='utf-8') as f:
-                f.write(content)
-        except Exception as e:
-            print(f"Error writing to daily log: {e}")
+            return os.path.getsize(self.get_log_file_path())
+        except OSError:
+            return 0
 
-        # 2. Write to Current Log (For Dashboard Viewer)
-        # Dashboard reads 'current.log'. We keep it updated.
-        current_path = self.get_current_log_path()
+    def _roll_segment(self):
+        """
+        Tutup segment aktif (YYYY-MM-DD.log -> YYYY-MM-DD.N.log) saat mencapai
+        max_segment_bytes, lalu minta archiver langsung mengompresnya.
+        Returns False jika segment gagal ditutup.
+        """
+        daily_path = self.get_log_file_path()
+        index = 1
+        while self._segment_exists(index):
+            index += 1
+        sealed_name = f"{self.current_date}.{index}.log"
+        
+        self._close_handles()
         try:
-            with open(current_path, 'a', encoding='utf-8') as f:
-                f.write(content)
-        except Exception as e:
-            print(f"Error writing to current log: {e}")
+            os.replace(daily_path, os.path.join(self.log_dir, sealed_name))
+            print(f"[LogManager] Segment full, sealed {sealed_name}")
+        except OSError as e:
+            print(f"[LogManager] Error sealing segment {sealed_name}: {e}")
+            return False
+        self.link_current_log()
+        self.archive_event.set()
+        return True
+
+    def _segment_exists(self, index):
+        name = f"{self.current_date}.{index}.log"
+        if os.path.exists(os.path.join(self.log_dir, name)):
+            return True
+        return any(os.path.exists(os.path.join(self.archive_dir, name + ext))
+                   for ext in ARCHIVE_EXTENSIONS.values())
 
     def archive_old_logs(self):
-        """Archive logs older than 7 days."""
+        """Archive sealed segments immediately and daily logs older than archive_after_days."""
         print("[Archive] Checking for old logs...")
-        cutoff_date = datetime.now() - timedelta(days=7)
+        cutoff_date = datetime.now() - timedelta(days=self.archive_after_days)
         
-        for filename in os.listdir(self.log_dir):
-            if filename.endswith(".log") and filename != "current.log":
-                try:
-                    # Parse filename YYYY-MM-DD.log
-                    date_str = filename.replace('.log', '')
-                    file_date = datetime.strptime(date_str, '%Y-%m-%d')
-                    
-                    if file_date < cutoff_date:
-                        self._compress_and_delete(filename)
-                except ValueError:
-                    continue # Skip files that don't match pattern
+        for filename in sorted(os.listdir(self.log_dir)):
+            match = LOG_FILENAME_RE.match(filename)
+            if not match:
+                continue # Skip current.log & files that don't match pattern
+            date_str, segment = match.groups()
+            file_date = datetime.strptime(date_str, '%Y-%m-%d')
+            
+            if not segment and date_str == self.current_date:
+                continue # File harian aktif tidak pernah diarsip
+            if segment or file_date < cutoff_date:
+                self._compress_and_delete(filename)
 
     def _compress_and_delete(self, filename):
         file_path = os.path.join(self.log_dir, filename)
-        zip_name = f"{filename}.zip"
-        zip_path = os.path.join(self.archive_dir, zip_name)
+        archive_format = self.archive_format
+        if archive_format == 'zstd':
+            try:
+                import zstandard
+            except ImportError:
+                print("[Archive] zstandard not installed (pip install zstandard), using gzip")
+                archive_format = 'gzip'
+        
+        archive_name = filename + ARCHIVE_EXTENSIONS[archive_format]
+        archive_path = os.path.join(self.archive_dir, archive_name)
+        tmp_path = archive_path + ".tmp"
         
-        print(f"[Archive] Compressing {filename} -> {zip_name}")
+        print(f"[Archive] Compressing {filename} -> {archive_name}")
         try:
-            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                zipf.write(file_path, arcname=filename)
+            # Streaming per chunk, file tidak pernah dibaca utuh ke memory
+            with open(file_path, 'rb') as src:
+                if archive_format == 'zip':
+                    with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+                        with zipf.open(filename, 'w', force_zip64=True) as dst:
+                            shutil.copyfileobj(src, dst, ARCHIVE_CHUNK_SIZE)
+                elif archive_format == 'gzip':
+                    with gzip.open(tmp_path, 'wb') as dst:
+                        shutil.copyfileobj(src, dst, ARCHIVE_CHUNK_SIZE)
+                else:
+                    with open(tmp_path, 'wb') as raw:
+                        with zstandard.ZstdCompressor().stream_writer(raw) as dst:
+                            shutil.copyfileobj(src, dst, ARCHIVE_CHUNK_SIZE)
+            os.replace(tmp_path, archive_path)
             
-            # Delete original file
+            # Delete original file (beserta index pencariannya)
             os.remove(file_path)
+            remove_file_index(self.log_dir, file_path)
             print(f"[Archive] Archived and deleted {filename}")
         except Exception as e:
             print(f"[Archive] Error archiving {filename}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+def lower_thread_priority():
+    """Turunkan prioritas CPU thread ini (Linux: nice per thread) agar kompresi tidak mengganggu service."""
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+    except (AttributeError, OSError):
+        pass # Tidak didukung (Windows / macOS)
 
 def archive_worker(rotator):
-    """Background thread to run archiving periodically."""
+    """Background thread to run archiving periodically (or right after a segment is sealed)."""
+    lower_thread_priority()
     while True:
+        rotator.archive_event.clear()
         rotator.archive_old_logs()
-        # Check every 24 hours
-        time.sleep(86400) 
+        # Check every 24 hours, or earlier when a segment is sealed
+        rotator.archive_event.wait(86400)
+
+def flush_worker(rotator):
+    """Background thread to flush buffered lines when the service goes quiet."""
+    while True:
+        time.sleep(rotator.flush_interval)
+        rotator.flush_if_due()
+
+class PipeBuffer:
+    """
+    Ring buffer (bounded, dalam byte) antara reader thread dan writer thread.
+    Policy saat penuh:
+      - block:       reader menunggu sampai ada ruang (backpressure ke child)
+      - drop_oldest: chunk tertua dibuang, jumlah baris yang hilang dihitung
+      - spill:       chunk baru ditulis ke file sementara di disk
+    """
+    def __init__(self, max_bytes=8 * 1024 * 1024, policy='block', spill_dir=None):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unsupported overflow policy: {policy}")
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.spill_dir = spill_dir
+        self.dropped_lines = 0
+        self._chunks = deque()
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._spill = None
+        self._spill_read = 0
+        self._spill_write = 0
+
+    def put(self, chunk):
+        with self._cond:
+            if self._spill_write > self._spill_read:
+                # Sedang spill: chunk baru tetap ke disk agar urutan terjaga
+                self._spill_chunk(chunk)
+            elif self._size + len(chunk) > self.max_bytes and self._chunks:
+                if self.policy == 'block':
+                    while self._size + len(chunk) > self.max_bytes and self._chunks:
+                        self._cond.wait()
+                    self._append(chunk)
+                elif self.policy == 'drop_oldest':
+                    while self._size + len(chunk) > self.max_bytes and self._chunks:
+                        dropped = self._chunks.popleft()
+                        self._size -= len(dropped)
+                        self.dropped_lines += dropped.count(b'\n')
+                    self._append(chunk)
+                else:
+                    self._spill_chunk(chunk)
+            else:
+                self._append(chunk)
+            self._cond.notify_all()
+
+    def get(self):
+        """
+        Ambil semua data yang tersedia sekaligus (bulk). Return None jika buffer
+        sudah ditutup dan kosong.
+        """
+        with self._cond:
+            while not self._chunks and self._spill_write == self._spill_read and not self._closed:
+                self._cond.wait()
+            if self._chunks:
+                data = b''.join(self._chunks)
+                self._chunks.clear()
+                self._size = 0
+            elif self._spill_write > self._spill_read:
+                data = self._read_spill()
+            else:
+                return None
+            self._cond.notify_all()
+            return data
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _append(self, chunk):
+        self._chunks.append(chunk)
+        self._size += len(chunk)
+
+    def _spill_chunk(self, chunk):
+        if self._spill is None:
+            self._spill = tempfile.TemporaryFile(prefix='pipe-spill-', dir=self.spill_dir)
+        self._spill.seek(self._spill_write)
+        self._spill.write(chunk)
+        self._spill_write += len(chunk)
+
+    def _read_spill(self):
+        self._spill.seek(self._spill_read)
+        data = self._spill.read(min(self.max_bytes, self._spill_write - self._spill_read))
+        self._spill_read += len(data)
+        if self._spill_read == self._spill_write:
+            # Spill sudah terkejar, pakai ulang file dari awal
+            self._spill.seek(0)
+            self._spill.truncate()
+            self._spill_read = self._spill_write = 0
+        return data
+
+def pipe_reader(stream, buffer):
+    """Reader thread: baca pipe secara binary per blok, tanpa menunggu disk."""
+    fd = stream.fileno()
+    try:
+        while True:
+            chunk = os.read(fd, PIPE_READ_SIZE)
+            if not chunk:
+                break
+            buffer.put(chunk)
+    finally:
+        buffer.close()
 
-def run_service(command, rotator):
+def log_writer(buffer, rotator):
+    """
+    Writer thread: decode per batch lalu tulis ke console dan log. Rotator hanya
+    menerima baris lengkap (sisa baris tanpa newline ditahan sampai batch
+    berikutnya), sehingga seal segment / rotasi harian tidak memotong baris.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    reported_drops = 0
+    partial = ''
+    while True:
+        data = buffer.get()
+        if data is None:
+            break
+        text = decoder.decode(data)
+        if buffer.dropped_lines != reported_drops:
+            marker = f"[LogManager] Dropped {buffer.dropped_lines - reported_drops} lines (buffer full)\n"
+            reported_drops = buffer.dropped_lines
+            sys.stdout.write(marker)
+            # Lanjutan baris partial ikut hilang: tutup baris yang terpotong dulu
+            partial = (partial + '\n' if partial else '') + marker
+        if not text and not partial:
+            continue
+        # Print to stdout so it still shows in console if running manually
+        sys.stdout.write(text)
+        sys.stdout.flush()
+        
+        # Write to logs: hanya sampai newline terakhir
+        text = partial + text
+        cut = text.rfind('\n') + 1
+        if cut == 0 and len(text) >= MAX_PARTIAL_LINE:
+            cut = len(text)
+        partial = text[cut:]
+        if cut:
+            rotator.write(text[:cut])
+    
+    tail = partial + decoder.decode(b'', final=True)
+    if tail:
+        rotator.write(tail)
+
+def run_service(command, rotator, buffer_bytes=8 * 1024 * 1024, overflow_policy='block'):
     """Run the actual service command."""
     print(f"[LogManager] Starting service: {command}")
     
@@ -111,24 +491,35 @@ def run_service(command, rotator):
         shell=True,
         stdout=subprocess.PIPE,
         stderr=subprocess.STDOUT, # Merge stderr into stdout
-        text=True,
-        bufsize=1, # Line buffered
-        encoding='utf-8',
-        errors='replace'
+        bufsize=0 # Binary, unbuffered: reader thread decides the block size
     )
     
-    # Read output line by line
-    while True:
-        line = process.stdout.readline()
-        if not line and process.poll() is not None:
-            break
-        if line:
-            # Print to stdout so it still shows in console if running manually
-            sys.stdout.write(line)
-            sys.stdout.flush()
-            
-            # Write to logs
-            rotator.write(line)
+    # Reader & writer dipisah: disk lambat tidak lagi memblokir pipe child
+    buffer = PipeBuffer(buffer_bytes, overflow_policy, spill_dir=rotator.log_dir)
+    reader_thread = threading.Thread(target=pipe_reader, args=(process.stdout, buffer), daemon=True)
+    writer_thread = threading.Thread(target=log_writer, args=(buffer, rotator), daemon=True)
+    reader_thread.start()
+    writer_thread.start()
+    
+    try:
+        writer_thread.join()
+        process.wait()
+    except KeyboardInterrupt:
+        # SIGINT/SIGTERM: child biasanya menerima sinyal yang sama (satu process group).
+        # Tunggu child keluar, lalu biarkan writer menguras sisa buffer sebelum rotator ditutup.
+        print("\n[LogManager] Stopping, draining log buffer...")
+        if process.poll() is None:
+            process.terminate()
+        try:
+            process.wait(timeout=DRAIN_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        reader_thread.join(DRAIN_TIMEOUT)
+        buffer.close()
+        writer_thread.join(DRAIN_TIMEOUT)
+        raise
+    if buffer.dropped_lines:
+        print(f"[LogManager] Total dropped lines: {buffer.dropped_lines}")
             
     return process.returncode
 
@@ -137,19 +528,44 @@ if __name__ == "__main__":
     parser.add_argument("--name", required=True, help="Service name (e.g. backend)")
     parser.add_argument("--cmd", required=True, help="Command to run")
     parser.add_argument("--log_dir", required=True, help="Directory to store logs")
+    parser.add_argument("--flush_bytes", type=int, default=64 * 1024, help="Flush log buffer after this many bytes")
+    parser.add_argument("--flush_interval", type=float, default=1.0, help="Flush log buffer after this many seconds")
+    parser.add_argument("--max_segment_bytes", type=int, default=0, help="Seal and archive the daily log once it reaches this size (0 = disabled)")
+    parser.add_argument("--archive_format", choices=sorted(ARCHIVE_EXTENSIONS), default="zip", help="Archive format for old logs and sealed segments")
+    parser.add_argument("--archive_after_days", type=positive_int, default=7, help="Archive daily logs older than this many days")
+    parser.add_argument("--buffer_bytes", type=int, default=8 * 1024 * 1024, help="Max bytes buffered between pipe reader and log writer")
+    parser.add_argument("--overflow_policy", choices=OVERFLOW_POLICIES, default="block", help="What to do when the buffer is full")
     
     args = parser.parse_args()
     
     print(f"[LogManager] Initializing for {args.name}...")
-    rotator = LogRotator(args.log_dir, args.name)
+    rotator = LogRotator(args.log_dir, args.name,
+                         flush_bytes=args.flush_bytes, flush_interval=args.flush_interval,
+                         max_segment_bytes=args.max_segment_bytes, archive_format=args.archive_format,
+                         archive_after_days=args.archive_after_days)
     
     # Start Archiver Thread (Daemon)
     archiver_thread = threading.Thread(target=archive_worker, args=(rotator,), daemon=True)
     archiver_thread.start()
     
+    # Start Flusher Thread (Daemon)
+    flusher_thread = threading.Thread(target=flush_worker, args=(rotator,), daemon=True)
+    flusher_thread.start()
+    
+    def handle_sigterm(signum, frame):
+        # Stop normal (supervisor / kill) diperlakukan seperti Ctrl+C agar buffer di-flush
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        raise KeyboardInterrupt
+    signal.signal(signal.SIGTERM, handle_sigterm)
+    
+    return_code = 0
     try:
         # Run Service
-        return_code = run_service(args.cmd, rotator)
-        sys.exit(return_code)
+        return_code = run_service(args.cmd, rotator,
+                                  buffer_bytes=args.buffer_bytes, overflow_policy=args.overflow_policy)
     except KeyboardInterrupt:
-        print("\n[LogManager] Stopping...")
+        print("[LogManager] Stopped")
+    finally:
+        # Pastikan buffer tidak hilang saat shutdown
+        rotator.close()
+    sys.exit(return_code)
@@ -0,0 +1,180 @@
+"""
+log_reader.py — Modul pembaca log untuk KieroOPS
+Membaca N baris terakhir dari file log besar dengan seek dari akhir file
+(bounded memory) dan menyimpan index jumlah baris per file agar
+total_lines tidak dihitung ulang dari awal di setiap request.
+Juga menyediakan follower ala `tail -f` untuk streaming log (SSE).
+"""
+
+import os
+import threading
+import time
+
+TAIL_BLOCK_SIZE = 64 * 1024
+COUNT_CHUNK_SIZE = 1024 * 1024
+
+# Index jumlah baris: path -> {inode, size, mtime, offset, lines}
+_line_index = {}
+_line_index_lock = threading.Lock()
+
+
+def tail_lines(file_path, lines_count=50, block_size=TAIL_BLOCK_SIZE):
+    """
+    Membaca `lines_count` baris terakhir dari file tanpa membaca seluruh isi file.
+    File dibaca mundur per blok sampai jumlah newline cukup.
+
+    Returns:
+        str: Isi baris-baris terakhir (sudah di-decode utf-8).
+    """
+    if lines_count <= 0:
+        return ""
+
+    with open(file_path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        if position == 0:
+            return ""
+
+        blocks = []
+        newlines = 0
+
+        # Newline penutup di akhir file bukan awal baris baru
+        f.seek(position - 1)
+        if f.read(1) == b'\n':
+            newlines -= 1
+
+        while position > 0 and newlines < lines_count:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            block = f.read(read_size)
+            blocks.append(block)
+            newlines += block.count(b'\n')
+
+    data = b''.join(reversed(blocks))
+    # Baris pertama di buffer bisa parsial, ambil hanya N baris terakhir
+    lines = data.splitlines(keepends=True)
+    return b''.join(lines[-lines_count:]).decode('utf-8', errors='ignore')
+
+
+def count_lines(file_path):
+    """
+    Mengembalikan jumlah baris file menggunakan index yang di-maintain.
+    Jika file hanya bertambah (append), hanya byte baru yang dihitung.
+    Jika file diganti (inode berbeda) atau terpotong, index dihitung ulang.
+    """
+    st = os.stat(file_path)
+    key = os.path.abspath(file_path)
+
+    with _line_index_lock:
+        entry = _line_index.get(key)
+
+    if entry and entry['inode'] == st.st_ino and entry['size'] == st.st_size \
+            and entry['mtime'] == st.st_mtime:
+        return _indexed_total(entry)
+
+    if not entry or entry['inode'] != st.st_ino or st.st_size < entry['offset']:
+        entry = {'inode': st.st_ino, 'offset': 0, 'lines': 0, 'ends_with_newline': True}
+    else:
+        entry = dict(entry)
+
+    with open(file_path, 'rb') as f:
+        f.seek(entry['offset'])
+        while True:
+            chunk = f.read(COUNT_CHUNK_SIZE)
+            if not chunk:
+                break
+            entry['lines'] += chunk.count(b'\n')
+            entry['offset'] += len(chunk)
+            entry['ends_with_newline'] = chunk.endswith(b'\n')
+
+    entry['size'] = entry['offset']
+    entry['mtime'] = st.st_mtime
+
+    with _line_index_lock:
+        _line_index[key] = entry
+
+    return _indexed_total(entry)
+
+
+def _indexed_total(entry):
+    # Baris terakhir tanpa newline tetap dihitung sebagai satu baris
+    return entry['lines'] + (0 if entry['ends_with_newline'] else 1)
+
+
+def follow_file(file_path, offset=None, inode=None, poll_interval=1.0,
+                heartbeat_interval=15.0, max_chunk=TAIL_BLOCK_SIZE):
+    """
+    Mengikuti file log seperti `tail -f`, mulai dari byte `offset`
+    (default: akhir file). Hanya byte baru yang dikirim, dipotong di newline
+    terakhir agar baris (dan karakter utf-8) tidak terbelah.
+    `inode` dari sesi sebelumnya dipakai untuk mendeteksi rotasi saat client
+    reconnect; jika berbeda, pembacaan dimulai dari awal file baru.
+
+    Yields:
+        tuple: (event, inode, offset, content)
+               event = 'append' | 'truncate' | 'rotate' | 'heartbeat'
+               offset = posisi byte setelah event (untuk resume)
+    """
+    f = None
+    idle = 0.0
+    try:
+        while True:
+            if f is None:
+                try:
+                    f = open(file_path, 'rb')
+                except FileNotFoundError:
+                    f = None
+
+                if f is not None:
+                    st = os.fstat(f.fileno())
+                    if inode is not None and st.st_ino != inode:
+                        offset = 0
+                        yield ('rotate', st.st_ino, offset, '')
+                    inode = st.st_ino
+                    if offset is None:
+                        offset = st.st_size
+                    elif offset > st.st_size:
+                        offset = 0
+                        yield ('truncate', inode, offset, '')
+                    f.seek(offset)
+
+            if f is not None:
+                size = os.fstat(f.fileno()).st_size
+                if size < offset:
+                    # File dipotong (truncate), mulai lagi dari awal
+                    offset = 0
+                    f.seek(0)
+                    yield ('truncate', inode, offset, '')
+
+                chunk = f.read(max_chunk) if size > offset else b''
+                cut = chunk.rfind(b'\n') + 1
+                if cut == 0 and len(chunk) == max_chunk:
+                    # Satu baris lebih panjang dari max_chunk, kirim apa adanya
+                    cut = len(chunk)
+                if cut:
+                    offset += cut
+                    idle = 0.0
+                    f.seek(offset)
+                    yield ('append', inode, offset, chunk[:cut].decode('utf-8', errors='ignore'))
+                    continue
+                # Baris belum lengkap, tunggu penulis selesai
+                f.seek(offset)
+
+                # Cek rotasi: path sekarang menunjuk ke file lain
+                try:
+                    if os.stat(file_path).st_ino != inode:
+                        f.close()
+                        f = None
+                        continue
+                except FileNotFoundError:
+                    pass
+
+            time.sleep(poll_interval)
+            idle += poll_interval
+            if idle >= heartbeat_interval:
+                idle = 0.0
+                yield ('heartbeat', inode, offset or 0, '')
+    finally:
+        if f is not None:
+            f.close()
@@ -0,0 +1,428 @@
+"""
+log_search.py — Modul pencarian log untuk KieroOPS
+Mencari baris log (regex + filter rentang waktu) di file harian, segment,
+dan arsip terkompresi (zip/gz/zst) milik sebuah service.
+
+Setiap file punya index ringan (disimpan di <log_dir>/.index/):
+  - blocks: potongan ~4MB dengan offset byte, rentang jam, dan token blob
+  - hours:  offset byte pertama untuk setiap jam (YYYY-MM-DD HH)
+Query hanya men-decode dan menjalankan regex pada block yang lolos filter
+waktu dan token, sehingga arsip 30 hari tidak perlu dipindai penuh.
+"""
+
+import os
+import re
+import json
+import gzip
+import zipfile
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import datetime
+
+INDEX_VERSION = 1
+INDEX_DIR_NAME = '.index'
+BLOCK_SIZE = 4 * 1024 * 1024
+MAX_BLOCK_TOKENS = 200000
+INDEX_CACHE_MAX_ENTRIES = 64
+
+LOG_FILE_RE = re.compile(r'^(\d{4}-\d{2}-\d{2})(?:\.\d+)?\.log(\.zip|\.gz|\.zst)?$')
+LINE_TS_RE = re.compile(r'^\[?(\d{4}-\d{2}-\d{2})[ T](\d{2}):(\d{2}):(\d{2})', re.MULTILINE)
+TOKEN_RE = re.compile(r'\w+')
+REGEX_META = set('.^$*+?{}[]()|\\')
+# Quantifier {m}, {m,}, {,n}, {m,n}; '{' lain dianggap literal oleh modul re
+QUANTIFIER_RE = re.compile(r'\{(\d*)(?:,(\d*))?\}')
+
+_index_cache = OrderedDict()  # path -> index (LRU)
+_index_lock = threading.Lock()
+
+
+# --- File helpers ---
+
+def list_log_files(log_dir):
+    """
+    Daftar file log yang bisa dicari: harian/segment di log_dir dan arsip di
+    log_dir/archive. current.log dilewati karena hanya pointer ke file harian.
+
+    Returns:
+        list: [(date_str, path), ...] terurut dari yang paling lama
+    """
+    files = []
+    for folder in (os.path.join(log_dir, 'archive'), log_dir):
+        if not os.path.isdir(folder):
+            continue
+        for entry in os.scandir(folder):
+            match = LOG_FILE_RE.match(entry.name)
+            if match and entry.is_file():
+                files.append((match.group(1), entry.path))
+    files.sort(key=lambda item: (item[0], os.path.basename(item[1])))
+    return files
+
+
+def open_log_stream(path):
+    """Buka file log (plain atau terkompresi) sebagai stream binary."""
+    if path.endswith('.zip'):
+        zf = zipfile.ZipFile(path)
+        names = zf.namelist()
+        if not names:
+            zf.close()
+            raise ValueError(f"Empty archive: {path}")
+        stream = zf.open(names[0])
+        # Tutup ZipFile saat stream ditutup
+        original_close = stream.close
+        def close():
+            original_close()
+            zf.close()
+        stream.close = close
+        return stream
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    if path.endswith('.zst'):
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("zstandard not installed. Run: pip install zstandard")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+    return open(path, 'rb')
+
+
+# --- Index ---
+
+def _index_path(log_dir, path):
+    name = os.path.relpath(path, log_dir).replace(os.sep, '__')
+    return os.path.join(log_dir, INDEX_DIR_NAME, name + '.json')
+
+
+def _cache_index(path, index):
+    """Dipanggil dengan _index_lock dipegang."""
+    _index_cache[path] = index
+    _index_cache.move_to_end(path)
+    while len(_index_cache) > INDEX_CACHE_MAX_ENTRIES:
+        _index_cache.popitem(last=False)
+
+
+def remove_file_index(log_dir, path):
+    """Hapus index file log yang sudah diarsip / dihapus (memory + sidecar .index)."""
+    with _index_lock:
+        _index_cache.pop(path, None)
+    try:
+        os.remove(_index_path(log_dir, path))
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"[LogSearch] Cannot remove index for {path}: {e}")
+
+
+def prune_indexes(log_dir, paths):
+    """Buang index (memory + sidecar) milik file di log_dir yang tidak ada lagi di `paths`."""
+    live = set(paths)
+    prefix = os.path.join(log_dir, '')
+    with _index_lock:
+        for path in [p for p in _index_cache if p.startswith(prefix) and p not in live]:
+            del _index_cache[path]
+
+    index_dir = os.path.join(log_dir, INDEX_DIR_NAME)
+    expected = {os.path.basename(_index_path(log_dir, path)) for path in live}
+    try:
+        entries = os.listdir(index_dir)
+    except OSError:
+        return
+    for name in entries:
+        if name.endswith('.json') and name not in expected:
+            try:
+                os.remove(os.path.join(index_dir, name))
+            except OSError:
+                pass
+
+
+def _hour_key(match):
+    return f"{match.group(1)} {match.group(2)}"
+
+
+def _index_block(raw, start, last_hour, hours):
+    """Bangun metadata satu block: rentang jam dan token blob."""
+    text = raw.decode('utf-8', errors='ignore')
+    first_hour = last_hour
+    char_pos, byte_pos = 0, start
+    for match in LINE_TS_RE.finditer(text):
+        hour = _hour_key(match)
+        if hour not in hours:
+            byte_pos += len(text[char_pos:match.start()].encode('utf-8'))
+            char_pos = match.start()
+            hours[hour] = byte_pos
+        if first_hour is None:
+            first_hour = hour
+        last_hour = hour
+
+    tokens = set(TOKEN_RE.findall(text.lower()))
+    blob = None
+    if len(tokens) <= MAX_BLOCK_TOKENS:
+        # "\ntok1\ntok2\n" -> cek prefix/suffix/exact cukup dengan substring search
+        blob = '\n' + '\n'.join(sorted(tokens)) + '\n'
+
+    block = {
+        "start": start,
+        "end": start + len(raw),
+        "first_hour": first_hour,
+        "last_hour": last_hour,
+        "tokens": blob
+    }
+    return block, last_hour
+
+
+def _build_index(path, stat, previous=None):
+    """
+    Bangun index file. Untuk file plain yang hanya bertambah (append),
+    index lama diteruskan mulai dari akhir block terakhir.
+    """
+    compressed = path.endswith(('.zip', '.gz', '.zst'))
+    if previous and not compressed and previous["inode"] == stat.st_ino \
+            and previous["indexed_bytes"] <= stat.st_size:
+        index = dict(previous, blocks=list(previous["blocks"]), hours=dict(previous["hours"]))
+    else:
+        index = {"version": INDEX_VERSION, "inode": stat.st_ino, "blocks": [],
+                 "hours": {}, "indexed_bytes": 0}
+
+    last_hour = index["blocks"][-1]["last_hour"] if index["blocks"] else None
+    offset = index["indexed_bytes"]
+    with open_log_stream(path) as stream:
+        if offset:
+            stream.seek(offset)
+        pending = b''
+        while True:
+            data = stream.read(BLOCK_SIZE)
+            if not data:
+                break
+            data = pending + data
+            # Block selalu berakhir di newline agar baris tidak terbelah
+            cut = data.rfind(b'\n') + 1
+            if cut == 0:
+                pending = data
+                continue
+            raw, pending = data[:cut], data[cut:]
+            block, last_hour = _index_block(raw, offset, last_hour, index["hours"])
+            index["blocks"].append(block)
+            offset += len(raw)
+        if pending and compressed:
+            # Arsip tidak akan bertambah, baris terakhir tanpa newline tetap diindex
+            block, last_hour = _index_block(pending, offset, last_hour, index["hours"])
+            index["blocks"].append(block)
+            offset += len(pending)
+
+    index["indexed_bytes"] = offset
+    index["size"] = stat.st_size
+    index["mtime"] = stat.st_mtime
+    return index
+
+
+def get_file_index(log_dir, path):
+    """Ambil index file dari cache memory / disk, bangun ulang jika file berubah."""
+    stat = os.stat(path)
+    with _index_lock:
+        index = _index_cache.get(path)
+        if index is not None:
+            _index_cache.move_to_end(path)
+
+    if index is None:
+        try:
+            with open(_index_path(log_dir, path), 'r') as f:
+                index = json.load(f)
+            if index.get("version") != INDEX_VERSION:
+                index = None
+        except (OSError, ValueError):
+            index = None
+
+    if index and index["inode"] == stat.st_ino and index["size"] == stat.st_size \
+            and index["mtime"] == stat.st_mtime:
+        with _index_lock:
+            _cache_index(path, index)
+        return index
+
+    index = _build_index(path, stat, previous=index)
+    with _index_lock:
+        _cache_index(path, index)
+
+    index_file = _index_path(log_dir, path)
+    try:
+        os.makedirs(os.path.dirname(index_file), exist_ok=True)
+        tmp_file = index_file + '.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp_file, index_file)
+    except OSError as e:
+        print(f"[LogSearch] Cannot persist index for {path}: {e}")
+    return index
+
+
+# --- Query ---
+
+def required_literals(pattern):
+    """
+    Ambil potongan literal (>= 3 karakter) yang pasti muncul di setiap match.
+    Pattern dengan alternation (|) atau group tidak difilter (return []).
+    """
+    if '|' in pattern or '(' in pattern:
+        return []
+    literals = []
+    current = ''
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == '\\' and i + 1 < len(pattern):
+            nxt = pattern[i + 1]
+            if nxt.isalnum():
+                # \d, \w, \s, dll -> bukan literal
+                literals.append(current)
+                current = ''
+            else:
+                current += nxt
+            i += 2
+            continue
+        if ch == '{':
+            quantifier = QUANTIFIER_RE.match(pattern, i)
+            if quantifier and (quantifier.group(1) or quantifier.group(2)):
+                # Isi {m,n} bukan literal; karakter sebelumnya opsional jika m = 0
+                if not quantifier.group(1) or int(quantifier.group(1)) == 0:
+                    current = current[:-1]
+                literals.append(current)
+                current = ''
+                i = quantifier.end()
+                continue
+            current += ch
+        elif ch in '?*':
+            # Karakter sebelumnya opsional
+            current = current[:-1]
+            literals.append(current)
+            current = ''
+        elif ch == '[':
+            literals.append(current)
+            current = ''
+            end = pattern.find(']', i + 2)
+            i = end if end != -1 else len(pattern)
+        elif ch in REGEX_META:
+            literals.append(current)
+            current = ''
+        else:
+            current += ch
+        i += 1
+    literals.append(current)
+    return [lit.lower() for lit in literals if len(lit) >= 3]
+
+
+def _block_may_match(blob, literals):
+    if blob is None:
+        return True
+    for literal in literals:
+        parts = TOKEN_RE.findall(literal)
+        if not parts:
+            continue
+        starts_in_word = bool(TOKEN_RE.match(literal))
+        ends_in_word = bool(TOKEN_RE.match(literal[-1]))
+        for i, token in enumerate(parts):
+            # Token di tepi literal bisa saja bagian dari kata yang lebih panjang
+            prefix = '\n' if i > 0 or not starts_in_word else ''
+            suffix = '\n' if i < len(parts) - 1 or not ends_in_word else ''
+            if prefix + token + suffix not in blob:
+                return False
+    return True
+
+
+def _hour_in_range(first_hour, last_hour, start_hour, end_hour):
+    if first_hour is None:
+        return True
+    if end_hour and first_hour > end_hour:
+        return False
+    if start_hour and last_hour < start_hour:
+        return False
+    return True
+
+
+def search_logs(log_dir, pattern, start=None, end=None, ignore_case=True, limit=500):
+    """
+    Cari baris yang cocok dengan regex `pattern` dalam rentang waktu [start, end].
+
+    Args:
+        start, end: datetime atau None
+    Returns:
+        dict: {"matches": [{file, offset, time, line}], "files_scanned", "blocks_scanned",
+               "blocks_skipped", "truncated"}
+    """
+    regex = re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+    literals = required_literals(pattern)
+    start_day = start.strftime('%Y-%m-%d') if start else None
+    end_day = end.strftime('%Y-%m-%d') if end else None
+    start_hour = start.strftime('%Y-%m-%d %H') if start else None
+    end_hour = end.strftime('%Y-%m-%d %H') if end else None
+
+    matches = []
+    stats = {"files_scanned": 0, "blocks_scanned": 0, "blocks_skipped": 0}
+    truncated = False
+
+    files = list_log_files(log_dir)
+    prune_indexes(log_dir, [path for _, path in files])
+    for day, path in files:
+        if (start_day and day < start_day) or (end_day and day > end_day):
+            continue
+        stats["files_scanned"] += 1
+        index = get_file_index(log_dir, path)
+        name = os.path.relpath(path, log_dir).replace('\\', '/')
+
+        with open_log_stream(path) as stream:
+            position = 0
+            for block in index["blocks"]:
+                if not _hour_in_range(block["first_hour"], block["last_hour"], start_hour, end_hour) \
+                        or not _block_may_match(block["tokens"], literals):
+                    stats["blocks_skipped"] += 1
+                    continue
+
+                if block["start"] != position:
+                    # Plain file: seek langsung. Arsip: decompress maju tanpa regex
+                    stream.seek(block["start"])
+                raw = stream.read(block["end"] - block["start"])
+                position = block["end"]
+                stats["blocks_scanned"] += 1
+
+                text = raw.decode('utf-8', errors='ignore')
+                timestamps = [(m.start(), m) for m in LINE_TS_RE.finditer(text)]
+                ts_positions = [pos for pos, _ in timestamps]
+                last_line_start = -1
+                char_pos, byte_pos = 0, block["start"]
+
+                for match in regex.finditer(text):
+                    line_start = text.rfind('\n', 0, match.start()) + 1
+                    if line_start == last_line_start:
+                        continue
+                    last_line_start = line_start
+                    line_end = text.find('\n', match.end())
+                    if line_end == -1:
+                        line_end = len(text)
+
+                    # Timestamp = baris bertimestamp terdekat sebelum match
+                    line_time = None
+                    i = bisect_right(ts_positions, line_start) - 1
+                    if i >= 0:
+                        ts = timestamps[i][1]
+                        line_time = datetime.strptime(ts.group(0).lstrip('[').replace('T', ' '),
+                                                      '%Y-%m-%d %H:%M:%S')
+                    elif block["first_hour"]:
+                        line_time = datetime.strptime(block["first_hour"], '%Y-%m-%d %H')
+                    if line_time and ((start and line_time < start) or (end and line_time > end)):
+                        continue
+
+                    byte_pos += len(text[char_pos:line_start].encode('utf-8'))
+                    char_pos = line_start
+                    matches.append({
+                        "file": name,
+                        "offset": byte_pos,
+                        "time": line_time.isoformat(sep=' ') if line_time else None,
+                        "line": text[line_start:line_end]
+                    })
+                    if len(matches) >= limit:
+                        truncated = True
+                        break
+                if truncated:
+                    break
+        if truncated:
+            break
+
+    return dict(matches=matches, truncated=truncated, **stats)
@@ -0,0 +1,147 @@
+"""
+process_snapshot.py — Snapshot tabel proses untuk KieroOPS
+Satu kali psutil.process_iter per siklus polling (name & cmdline sudah
+di-lowercase), lalu semua check_keyword dicocokkan sekaligus dalam satu pass
+menggunakan matcher Aho-Corasick. PID hasil match diingat agar pengecekan
+berikutnya cukup memeriksa PID tersebut secara langsung.
+"""
+
+import time
+import threading
+from collections import deque
+
+import psutil
+
+
+class KeywordMatcher:
+    """Aho-Corasick multi-pattern matcher (case-sensitive, input sudah lowercase)."""
+
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [set()]
+
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for ch in keyword:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(set())
+                state = nxt
+            self._output[state].add(index)
+
+        # BFS untuk fail link
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._output[nxt] |= self._output[self._fail[nxt]]
+
+    def find(self, text):
+        """Return set index keyword yang muncul di text."""
+        found = set()
+        state = 0
+        goto, fail, output = self._goto, self._fail, self._output
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                found |= output[state]
+        return found
+
+
+class ProcessSnapshot:
+    def __init__(self, max_age=2.0):
+        """
+        Args:
+            max_age: umur maksimum snapshot (detik), kira-kira satu siklus polling
+        """
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._taken_at = float('-inf')
+        self._processes = []        # [(pid, "name\0cmdline"), ...] lowercase
+        self._keywords = set()
+        self._matches = {}          # keyword -> [pid, ...] untuk snapshot saat ini
+        self._known_pids = {}       # keyword -> [pid, ...] dari match terakhir
+
+    def _take(self):
+        processes = []
+        for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
+            try:
+                name = (proc.info.get('name', '') or '').lower()
+                cmdline = ' '.join(proc.info.get('cmdline', []) or []).lower()
+                processes.append((proc.info['pid'], name + '\0' + cmdline))
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        self._processes = processes
+        self._taken_at = time.monotonic()
+        self._matches = {}
+
+    def _match_all(self):
+        """Cocokkan semua keyword terdaftar ke snapshot dalam satu pass."""
+        keywords = sorted(self._keywords)
+        matcher = KeywordMatcher(keywords)
+        matches = {keyword: [] for keyword in keywords}
+        for pid, haystack in self._processes:
+            for index in matcher.find(haystack):
+                matches[keywords[index]].append(pid)
+        self._matches = matches
+
+    def _pids_still_match(self, keyword, pids):
+        """Cek ulang PID yang sudah diketahui tanpa scan seluruh tabel proses."""
+        alive = []
+        for pid in pids:
+            try:
+                proc = psutil.Process(pid)
+                name = (proc.name() or '').lower()
+                cmdline = ' '.join(proc.cmdline() or []).lower()
+                if keyword in name or keyword in cmdline:
+                    alive.append(pid)
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+        return alive
+
+    def find_pids(self, keyword):
+        """
+        Return daftar PID yang name/cmdline-nya mengandung keyword.
+        Urutan: PID yang sudah diketahui -> snapshot bersama (diambil ulang
+        jika lebih tua dari max_age).
+        """
+        keyword = keyword.lower()
+        if not keyword:
+            return []
+
+        with self._lock:
+            known = self._known_pids.get(keyword)
+        if known:
+            alive = self._pids_still_match(keyword, known)
+            if alive:
+                with self._lock:
+                    self._known_pids[keyword] = alive
+                return alive
+
+        with self._lock:
+            if time.monotonic() - self._taken_at >= self.max_age:
+                self._take()
+            if keyword not in self._keywords:
+                self._keywords.add(keyword)
+                self._matches = {}
+            if not self._matches:
+                self._match_all()
+            pids = self._matches.get(keyword, [])
+            self._known_pids[keyword] = pids
+            return pids
+
+
+process_snapshot = ProcessSnapshot()
@@ -0,0 +1,319 @@
+"""
+process_supervisor.py — Supervisor proses service untuk KieroOPS
+command_start dijalankan sebagai child process milik aplikasi di process
+group / session sendiri, sehingga:
+- status service yang dijalankan dari dashboard dibaca langsung dari state
+  supervisor (dict lookup), tanpa scan process table
+- stop hanya mematikan process tree milik service itu (SIGTERM ke group,
+  SIGKILL setelah stop_timeout), bukan semua proses dengan nama yang sama
+- exit di-reap oleh thread waiter per proses (tidak ada zombie)
+- restart policy per service: 'no' (default), 'on-failure', 'always',
+  dengan backoff eksponensial
+Setiap perubahan state dipublish sebagai event ke listener (subscribe).
+
+Command yang selesai dengan exit code 0 dalam START_GRACE detik dianggap
+launcher (mis. "net start mysql", "systemctl start x"): service tidak lagi
+dilacak dan status kembali dicek lewat command_status / check_keyword.
+"""
+
+import os
+import sys
+import time
+import signal
+import threading
+import subprocess
+
+import psutil
+
+START_GRACE = 1.0             # detik hidup sebelum Starting -> Running
+STOP_TIMEOUT = 10.0           # detik menunggu SIGTERM sebelum SIGKILL
+BACKOFF_INITIAL = 1.0
+BACKOFF_MAX = 60.0
+BACKOFF_RESET_AFTER = 30.0    # hidup selama ini = restart counter di-reset
+RESTART_POLICIES = ('no', 'on-failure', 'always')
+
+# State supervisor -> status yang ditampilkan dashboard
+STATUS_MAP = {
+    'starting': 'Starting',
+    'running': 'Running',
+    'stopping': 'Stopping',
+    'backoff': 'Starting',
+    'stopped': 'Stopped',
+    'failed': 'Error'
+}
+# State yang berarti supervisor memegang (atau akan menjalankan ulang) proses
+ACTIVE_STATES = ('starting', 'running', 'stopping', 'backoff')
+
+IS_WINDOWS = sys.platform.startswith('win')
+
+
+class ManagedProcess:
+    def __init__(self, service_id, command, restart_policy='no', max_retries=5,
+                 stop_timeout=STOP_TIMEOUT):
+        self.service_id = service_id
+        self.command = command
+        self.restart_policy = restart_policy
+        self.max_retries = max_retries
+        self.stop_timeout = stop_timeout
+        self.popen = None
+        self.state = 'stopped'
+        self.exit_code = None
+        self.started_at = None
+        self.restarts = 0
+        self.stop_requested = False
+        self.generation = 0       # naik setiap spawn, untuk membatalkan timer lama
+
+    @property
+    def pid(self):
+        return self.popen.pid if self.popen else None
+
+    def info(self):
+        return {
+            "service_id": self.service_id,
+            "state": self.state,
+            "status": STATUS_MAP[self.state],
+            "pid": self.pid,
+            "exit_code": self.exit_code,
+            "started_at": self.started_at,
+            "restarts": self.restarts,
+            "restart_policy": self.restart_policy
+        }
+
+
+class ProcessSupervisor:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._processes = {}      # service_id -> ManagedProcess
+        self._listeners = []
+
+    # --- EVENTS ---
+
+    def subscribe(self, listener):
+        """listener(event_dict) dipanggil setiap state berubah (jangan blocking)."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def _transition(self, proc, state, exit_code=None):
+        """Dipanggil dengan _lock dipegang."""
+        previous = proc.state
+        proc.state = state
+        if exit_code is not None:
+            proc.exit_code = exit_code
+        if previous == state:
+            return
+        event = dict(proc.info(), previous=previous, ts=time.time())
+        for listener in list(self._listeners):
+            try:
+                listener(event)
+            except Exception as e:
+                print(f"[Supervisor] Listener failed: {e}")
+
+    # --- STATUS ---
+
+    def status(self, service_id):
+        """
+        Status dashboard untuk service yang dipegang supervisor ('Error' jika failed),
+        None jika tidak dilacak.
+        """
+        proc = self._processes.get(service_id)
+        if proc is None or proc.state not in ACTIVE_STATES and proc.state != 'failed':
+            return None
+        return STATUS_MAP[proc.state]
+
+    def info(self, service_id=None):
+        with self._lock:
+            if service_id is not None:
+                proc = self._processes.get(service_id)
+                return proc.info() if proc else None
+            return {sid: proc.info() for sid, proc in self._processes.items()}
+
+    def forget_failed(self, service_id):
+        """Lupakan service yang failed (mis. probe melihatnya berjalan lagi di luar dashboard)."""
+        with self._lock:
+            proc = self._processes.get(service_id)
+            if proc is not None and proc.state == 'failed':
+                del self._processes[service_id]
+
+    def is_managed(self, service_id):
+        proc = self._processes.get(service_id)
+        return proc is not None and proc.state in ACTIVE_STATES
+
+    # --- START / STOP ---
+
+    def start(self, service):
+        """
+        Jalankan command_start service di bawah supervisor.
+
+        Returns:
+            tuple: (success, message)
+        """
+        service_id = service['id']
+        policy = service.get('restart_policy', 'no') or 'no'
+        if policy not in RESTART_POLICIES:
+            return False, f"Unsupported restart_policy: {policy}"
+
+        with self._lock:
+            proc = self._processes.get(service_id)
+            if proc is not None and proc.state in ACTIVE_STATES:
+                return True, f"Already {STATUS_MAP[proc.state].lower()} (pid {proc.pid})"
+            proc = ManagedProcess(
+                service_id, service['command_start'],
+                restart_policy=policy,
+                max_retries=int(service.get('restart_max_retries', 5)),
+                stop_timeout=float(service.get('stop_timeout', STOP_TIMEOUT))
+            )
+            self._processes[service_id] = proc
+            try:
+                self._spawn(proc)
+            except Exception as e:
+                self._transition(proc, 'failed')
+                return False, str(e)
+            return True, f"Started (pid {proc.pid})"
+
+    def _spawn(self, proc):
+        """Dipanggil dengan _lock dipegang."""
+        kwargs = {}
+        if IS_WINDOWS:
+            kwargs['creationflags'] = subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            # Session baru: pgid == pid, seluruh tree bisa di-signal sekaligus
+            kwargs['start_new_session'] = True
+        proc.popen = subprocess.Popen(proc.command, shell=True,
+                                      stdin=subprocess.DEVNULL, **kwargs)
+        proc.started_at = time.time()
+        proc.exit_code = None
+        proc.stop_requested = False
+        proc.generation += 1
+        self._transition(proc, 'starting')
+
+        generation = proc.generation
+        threading.Thread(target=self._wait, args=(proc, proc.popen, generation),
+                         name=f'supervisor-{proc.service_id}', daemon=True).start()
+        timer = threading.Timer(START_GRACE, self._mark_running, args=(proc, generation))
+        timer.daemon = True
+        timer.start()
+
+    def _mark_running(self, proc, generation):
+        with self._lock:
+            if proc.generation == generation and proc.state == 'starting':
+                self._transition(proc, 'running')
+
+    def _wait(self, proc, popen, generation):
+        """Thread waiter: reap exit lalu tentukan state berikutnya."""
+        code = popen.wait()
+        with self._lock:
+            if proc.generation != generation:
+                return
+            uptime = time.time() - proc.started_at
+            if proc.stop_requested:
+                self._transition(proc, 'stopped', code)
+                return
+            if code == 0 and uptime < START_GRACE:
+                # Launcher: service berjalan di luar supervisor
+                self._processes.pop(proc.service_id, None)
+                self._transition(proc, 'stopped', code)
+                return
+
+            if uptime >= BACKOFF_RESET_AFTER:
+                proc.restarts = 0
+            restart = proc.restart_policy == 'always' or \
+                (proc.restart_policy == 'on-failure' and code != 0)
+            if not restart or proc.restarts >= proc.max_retries:
+                self._transition(proc, 'failed' if code != 0 else 'stopped', code)
+                return
+
+            delay = min(BACKOFF_INITIAL * (2 ** proc.restarts), BACKOFF_MAX)
+            proc.restarts += 1
+            self._transition(proc, 'backoff', code)
+            print(f"[Supervisor] {proc.service_id} exited with {code}, restart in {delay:.1f}s")
+            timer = threading.Timer(delay, self._restart, args=(proc, generation))
+            timer.daemon = True
+            timer.start()
+
+    def _restart(self, proc, generation):
+        with self._lock:
+            if proc.generation != generation or proc.state != 'backoff':
+                return
+            try:
+                self._spawn(proc)
+            except Exception as e:
+                print(f"[Supervisor] Restart of {proc.service_id} failed: {e}")
+                self._transition(proc, 'failed')
+
+    def stop(self, service_id):
+        """
+        Hentikan process tree service: SIGTERM, lalu SIGKILL setelah stop_timeout.
+        Tidak menunggu proses selesai; waiter thread yang mencatat exit.
+
+        Returns:
+            tuple: (success, message) — (False, ...) jika service tidak dipegang supervisor
+        """
+        with self._lock:
+            proc = self._processes.get(service_id)
+            if proc is None or proc.state not in ACTIVE_STATES:
+                return False, "Service is not managed by the supervisor"
+            proc.stop_requested = True
+            if proc.state == 'backoff':
+                # Belum ada proses yang hidup, cukup batalkan restart
+                self._transition(proc, 'stopped')
+                return True, "Pending restart cancelled"
+            if proc.state == 'stopping':
+                return True, f"Already stopping (pid {proc.pid})"
+            self._transition(proc, 'stopping')
+            popen, generation = proc.popen, proc.generation
+
+        _signal_tree(popen, kill=False)
+        timer = threading.Timer(proc.stop_timeout, self._escalate, args=(proc, popen, generation))
+        timer.daemon = True
+        timer.start()
+        return True, f"Stopping (pid {popen.pid})"
+
+    def _escalate(self, proc, popen, generation):
+        if popen.poll() is None and proc.generation == generation:
+            print(f"[Supervisor] {proc.service_id} did not exit after SIGTERM, killing")
+            _signal_tree(popen, kill=True)
+
+    def run_command(self, command):
+        """
+        Jalankan command sekali (mis. command_stop untuk service yang tidak
+        dijalankan dari dashboard). Tidak dilacak, tapi tetap di-reap.
+        """
+        try:
+            popen = subprocess.Popen(command, shell=True, stdin=subprocess.DEVNULL)
+        except Exception as e:
+            return False, str(e)
+        threading.Thread(target=popen.wait, name='supervisor-oneshot', daemon=True).start()
+        return True, "Command executed"
+
+
+def _signal_tree(popen, kill):
+    """Kirim SIGTERM/SIGKILL ke process group (POSIX) atau process tree (Windows)."""
+    if popen.poll() is not None:
+        return
+    if not IS_WINDOWS:
+        try:
+            os.killpg(popen.pid, signal.SIGKILL if kill else signal.SIGTERM)
+            return
+        except (ProcessLookupError, PermissionError):
+            return
+        except OSError:
+            pass
+    # Windows / fallback: anak dulu, lalu shell induknya
+    try:
+        parent = psutil.Process(popen.pid)
+        tree = parent.children(recursive=True) + [parent]
+    except psutil.NoSuchProcess:
+        return
+    for p in tree:
+        try:
+            p.kill() if kill else p.terminate()
+        except psutil.NoSuchProcess:
+            pass
+
+
+supervisor = ProcessSupervisor()
@@ -0,0 +1,316 @@
+"""
+registry_store.py — Registry service in-memory untuk KieroOPS
+configs/registry_*.json di-parse sekali lalu disimpan di memory bersama index
+id -> service. File hanya di-parse ulang jika inode/mtime/size berubah (diedit
+manual atau oleh worker lain); tulisan dari aplikasi langsung memperbarui cache.
+Registry yang dikembalikan dipakai bersama semua request: jangan dimutasi.
+
+Penulisan aman untuk beberapa worker (gunicorn):
+- lock file (flock) membungkus setiap read-modify-write
+- file ditulis ke temp file, fsync, lalu os.replace (tidak pernah terpotong)
+- optimistic concurrency: caller mengirim etag saat membaca, ditolak jika sudah berubah
+- setiap perubahan dicatat di journal append-only (registry_*.journal.jsonl);
+  worker lain menerapkan entry journal baru tanpa parse ulang seluruh file
+"""
+
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: hanya lock antar thread
+    fcntl = None
+
+REGISTRY_PATHS = {
+    'development': 'configs/registry_dev.json',
+    'production': 'configs/registry_prod.json'
+}
+
+# Journal di-rotate ke .1 setelah ukuran ini
+JOURNAL_MAX_BYTES = 1024 * 1024
+
+
+class RegistryConflict(Exception):
+    """Registry sudah diubah orang lain sejak dibaca (etag tidak cocok)."""
+
+
+def _etag(data):
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
+def _stat_signature(st):
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+class RegistryStore:
+    def __init__(self, path):
+        self.path = path
+        self.journal_path = os.path.splitext(path)[0] + '.journal.jsonl'
+        self.lock_path = path + '.lock'
+        self._lock = threading.RLock()
+        self._signature = None
+        self._registry = {"services": []}
+        self._index = {}
+        self.etag = None
+        self.version = 0            # seq journal terakhir yang sudah tercermin di cache
+        self._journal_inode = None
+        self._journal_offset = 0
+        self._journal_seq = 0       # seq terakhir yang sudah dibaca dari journal
+
+    def _set(self, registry, signature, etag):
+        self._registry = registry
+        self._index = {svc.get('id'): svc for svc in registry.get('services', [])}
+        self._signature = signature
+        self.etag = etag
+
+    # --- READ ---
+
+    def load(self):
+        """Registry terkini; parse ulang hanya jika file berubah sejak load terakhir."""
+        try:
+            signature = _stat_signature(os.stat(self.path))
+        except OSError as e:
+            return {"error": str(e), "services": []}
+
+        with self._lock:
+            if signature != self._signature:
+                try:
+                    if not self._replay_journal(signature):
+                        self._reload()
+                except Exception as e:
+                    return {"error": str(e), "services": []}
+            return self._registry
+
+    def get_service(self, service_id):
+        """Lookup service by id lewat index (O(1)), None jika tidak ada."""
+        with self._lock:
+            self.load()
+            return self._index.get(service_id)
+
+    def read_raw(self):
+        """Isi file apa adanya + etag-nya (untuk editor JSON di Settings)."""
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return '{}', None
+        return data.decode('utf-8'), _etag(data)
+
+    def _reload(self):
+        with open(self.path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            data = f.read()
+        registry = json.loads(data)
+        # Entry journal sampai titik ini sudah tercermin di file
+        self._read_journal()
+        self.version = self._journal_seq
+        self._set(registry, _stat_signature(st), _etag(data))
+
+    def _read_journal(self):
+        """Entry journal baru sejak pembacaan terakhir (hanya baris yang lengkap)."""
+        try:
+            f = open(self.journal_path, 'rb')
+        except FileNotFoundError:
+            return []
+        with f:
+            st = os.fstat(f.fileno())
+            if st.st_ino != self._journal_inode or st.st_size < self._journal_offset:
+                # Journal baru / di-rotate
+                self._journal_inode = st.st_ino
+                self._journal_offset = 0
+            f.seek(self._journal_offset)
+            data = f.read()
+        complete = data[:data.rfind(b'\n') + 1]
+        self._journal_offset += len(complete)
+        entries = [json.loads(line) for line in complete.splitlines() if line.strip()]
+        if entries:
+            self._journal_seq = entries[-1]['seq']
+        return entries
+
+    def _replay_journal(self, signature):
+        """
+        Terapkan entry journal baru ke cache (upsert/delete per service).
+        Return False jika tidak bisa (entry hilang, replace penuh, atau file
+        diubah di luar aplikasi) sehingga perlu parse ulang seluruh file.
+        """
+        if self._signature is None:
+            return False
+        entries = self._read_journal()
+        if not entries or entries[0]['seq'] != self.version + 1:
+            return False
+
+        services = list(self._registry.get('services', []))
+        etag = self.etag
+        for entry in entries:
+            if entry['etag_before'] != etag or entry['op'] not in ('upsert', 'delete'):
+                return False
+            _apply_op(services, entry['op'], entry['service_id'], entry.get('service'))
+            etag = entry['etag_after']
+        if tuple(entries[-1]['signature']) != signature:
+            return False
+
+        self._set(dict(self._registry, services=services), signature, etag)
+        self.version = entries[-1]['seq']
+        return True
+
+    # --- WRITE ---
+
+    @contextmanager
+    def _write_lock(self):
+        """Lock antar thread + antar proses (flock pada file .lock)."""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.lock_path, 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write_atomic(self, data):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix='.registry-', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            try:
+                os.chmod(tmp_path, os.stat(self.path).st_mode & 0o777)
+            except OSError:
+                pass
+            os.replace(tmp_path, self.path)
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        # fsync direktori agar rename ikut persisten
+        try:
+            dir_fd = os.open(directory, os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        except OSError:
+            pass
+
+    def _append_journal(self, entry):
+        try:
+            if os.path.getsize(self.journal_path) > JOURNAL_MAX_BYTES:
+                os.replace(self.journal_path, self.journal_path + '.1')
+        except OSError:
+            pass
+        with open(self.journal_path, 'ab') as f:
+            f.write(json.dumps(entry).encode('utf-8') + b'\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _current(self):
+        """Registry terkini untuk read-modify-write; gagal jika file tidak bisa dibaca."""
+        current = self.load()
+        if "error" in current:
+            raise RuntimeError(current["error"])
+        return current
+
+    def _commit(self, registry, op, service_id=None, service=None, etag=None, user=None):
+        """Dipanggil di dalam _write_lock setelah load(): cek etag, tulis atomik, catat ke journal."""
+        if etag and etag != self.etag:
+            raise RegistryConflict("Registry was modified by someone else, reload and try again")
+
+        data = json.dumps(registry, indent=4).encode('utf-8')
+        etag_before = self.etag
+        self._write_atomic(data)
+        signature = _stat_signature(os.stat(self.path))
+
+        entry = {
+            "seq": self.version + 1,
+            "ts": time.time(),
+            "user": user,
+            "op": op,
+            "service_id": service_id,
+            "service": service,
+            "etag_before": etag_before,
+            "etag_after": _etag(data),
+            "signature": list(signature)
+        }
+        self._append_journal(entry)
+        # Entry milik sendiri sudah diterapkan, lewati saat membaca journal berikutnya
+        self._read_journal()
+        self.version = entry["seq"]
+        self._set(registry, signature, entry["etag_after"])
+        return registry
+
+    def save(self, registry, etag=None, user=None):
+        """Ganti seluruh registry (editor JSON di Settings)."""
+        with self._write_lock():
+            # File rusak / hilang tetap boleh ditimpa dari editor
+            self.load()
+            return self._commit(registry, 'replace', etag=etag, user=user)
+
+    def upsert_service(self, service, original_id=None, etag=None, user=None):
+        """
+        Tambah service baru, atau ganti service `original_id`. Field 'status'
+        service lama dipertahankan jika service baru tidak membawanya.
+        Rename ke id yang sudah dipakai service lain ditolak dengan RegistryConflict.
+        """
+        with self._write_lock():
+            current = self._current()
+            service = dict(service)
+            services = list(current.get('services', []))
+            if original_id:
+                old = self._index.get(original_id)
+                if old is None:
+                    raise KeyError(f"Service '{original_id}' not found")
+                new_id = service.get('id')
+                if new_id != original_id and new_id in self._index:
+                    raise RegistryConflict(f"Cannot rename '{original_id}': service '{new_id}' already exists")
+                service.setdefault('status', old.get('status', 'Stopped'))
+            elif service.get('id') in self._index:
+                raise ValueError(f"Service '{service.get('id')}' already exists")
+            _apply_op(services, 'upsert', original_id or service.get('id'), service)
+            registry = dict(current, services=services)
+            return self._commit(registry, 'upsert', original_id or service.get('id'), service,
+                                etag=etag, user=user)
+
+    def delete_service(self, service_id, etag=None, user=None):
+        with self._write_lock():
+            current = self._current()
+            services = list(current.get('services', []))
+            _apply_op(services, 'delete', service_id)
+            registry = dict(current, services=services)
+            return self._commit(registry, 'delete', service_id, etag=etag, user=user)
+
+
+def _apply_op(services, op, service_id, service=None):
+    """Terapkan satu operasi journal ke list services (in-place)."""
+    index = next((i for i, svc in enumerate(services) if svc.get('id') == service_id), None)
+    if op == 'delete':
+        if index is not None:
+            del services[index]
+    elif index is not None:
+        services[index] = service
+    else:
+        services.append(service)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_registry_store(env):
+    """Store untuk environment 'development' / 'production' (dibuat sekali per path)."""
+    path = REGISTRY_PATHS['production'] if env == 'production' else REGISTRY_PATHS['development']
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = RegistryStore(path)
+        return store
@@ -0,0 +1,165 @@
+"""
+status_cache.py — Cache status service untuk KieroOPS
+Status setiap service di-cache dengan TTL dan dievaluasi paralel di thread pool.
+Request yang datang bersamaan saat refresh berjalan menunggu hasil refresh yang
+sama (coalescing), sehingga hanya ada satu refresh in-flight.
+Probe yang selesai setelah refresh berhenti menunggu tetap disimpan ke cache.
+Listener (subscribe) dipanggil setiap hasil probe mengubah status service.
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# Waktu tambahan di atas probe_timeout: probe boleh memakai fallback check_keyword
+# setelah command_status timeout
+PROBE_FALLBACK_MARGIN = 2.0
+
+
+class StatusCache:
+    def __init__(self, probe, ttl=3.0, probe_timeout=5.0, max_workers=8):
+        """
+        Args:
+            probe: fungsi(service_config, timeout) -> status string
+            ttl: umur maksimum status di cache (detik)
+            probe_timeout: batas waktu menunggu satu probe (detik)
+        """
+        self.probe = probe
+        self.ttl = ttl
+        self.probe_timeout = probe_timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='status-probe')
+        self._lock = threading.Lock()
+        self._entries = {}   # key -> (status, checked_at)
+        self._pending = {}   # key -> Future yang masih berjalan
+        self._inflight = None
+        self._listeners = []
+
+    def subscribe(self, listener):
+        """listener(changes) dipanggil dengan {service_id: status} saat probe mengubah status (jangan blocking)."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def _notify(self, changes):
+        """Dipanggil tanpa _lock dipegang."""
+        if not changes:
+            return
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(changes)
+            except Exception as e:
+                print(f"[StatusCache] Listener failed: {e}")
+
+    def _set_entry(self, key, status, now, changes):
+        """Dipanggil dengan _lock dipegang; catat perubahan status ke `changes`."""
+        previous = self._entries.get(key)
+        if previous is not None and previous[0] != status:
+            changes[key[0]] = status
+        self._entries[key] = (status, now)
+
+    def configure(self, ttl=None, probe_timeout=None):
+        """Update TTL / timeout dari config_app.json tanpa membuat cache baru."""
+        if ttl is not None:
+            self.ttl = float(ttl)
+        if probe_timeout is not None:
+            self.probe_timeout = float(probe_timeout)
+
+    @staticmethod
+    def _key(service_config):
+        # Status berubah arti jika cara pengecekannya diubah di registry
+        return (service_config.get('id'),
+                service_config.get('command_status', ''),
+                service_config.get('check_keyword', ''))
+
+    def invalidate(self, service_id=None):
+        """Hapus cache (semua, atau satu service) misalnya setelah start/stop."""
+        with self._lock:
+            if service_id is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == service_id]:
+                    del self._entries[key]
+
+    def get_statuses(self, services):
+        """
+        Returns:
+            dict: {service_id: status}
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                stale = [svc for svc in services
+                         if now - self._entries.get(self._key(svc), (None, float('-inf')))[1] >= self.ttl]
+                if not stale:
+                    return self._collect(services)
+                inflight = self._inflight
+                if inflight is None:
+                    inflight = self._inflight = threading.Event()
+                    break
+            # Refresh lain sedang berjalan, tunggu hasilnya lalu cek ulang
+            inflight.wait()
+
+        try:
+            self._refresh(stale)
+        finally:
+            with self._lock:
+                self._inflight = None
+            inflight.set()
+
+        with self._lock:
+            return self._collect(services)
+
+    def _refresh(self, services):
+        futures = {}
+        submitted = []
+        with self._lock:
+            for svc in services:
+                key = self._key(svc)
+                future = self._pending.get(key)
+                if future is None:
+                    # Probe sebelumnya yang hang tidak di-submit ulang
+                    future = self._executor.submit(self.probe, svc, self.probe_timeout)
+                    self._pending[key] = future
+                    submitted.append((key, future))
+                futures[future] = key
+        # Di luar lock: callback langsung dijalankan jika future sudah selesai
+        for key, future in submitted:
+            future.add_done_callback(lambda f, key=key: self._store(key, f))
+
+        done, _ = wait(futures, timeout=self.probe_timeout + PROBE_FALLBACK_MARGIN)
+        now = time.monotonic()
+        changes = {}
+        with self._lock:
+            for future, key in futures.items():
+                if future in done:
+                    self._set_entry(key, self._result(key, future), now, changes)
+                    if self._pending.get(key) is future:
+                        del self._pending[key]
+                elif key not in self._entries:
+                    self._entries[key] = ("Unknown", now)
+                else:
+                    # Probe masih berjalan: pakai status terakhir, hasilnya disimpan _store saat selesai
+                    self._entries[key] = (self._entries[key][0], now)
+        self._notify(changes)
+
+    @staticmethod
+    def _result(key, future):
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"Status probe failed for {key[0]}: {e}")
+            return "Unknown"
+
+    def _store(self, key, future):
+        """Done callback: simpan hasil probe (juga yang selesai setelah refresh berhenti menunggu)."""
+        status = self._result(key, future)
+        changes = {}
+        with self._lock:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+                self._set_entry(key, status, time.monotonic(), changes)
+        self._notify(changes)
+
+    def _collect(self, services):
+        return {svc['id']: self._entries.get(self._key(svc), ("Unknown", 0))[0] for svc in services}
@@ -0,0 +1,163 @@
+"""
+status_events.py — Push status service & statistik sistem ke dashboard (SSE)
+Satu evaluator background per proses (bukan per tab browser) mengevaluasi
+status semua service, membandingkan dengan snapshot sebelumnya, dan hanya
+mengirim service yang berubah ke semua client yang terhubung. Sample system
+stats terbaru ikut dikirim setiap STATS_INTERVAL detik.
+
+Evaluator hanya berjalan selama ada subscriber. Event dari process supervisor
+membangunkan evaluator saat itu juga, sehingga start/stop dari dashboard
+terlihat di semua tab dalam < 1 detik tanpa menunggu siklus berikutnya.
+Perubahan yang hanya terdeteksi lewat probe (service dijalankan/dimatikan di
+luar dashboard) baru terlihat setelah probe berikutnya: paling lambat TTL
+StatusCache + STATUS_INTERVAL + durasi probe. Hasil probe yang mengubah status
+juga membangunkan evaluator (StatusCache.subscribe), termasuk probe yang
+selesai terlambat.
+"""
+
+import json
+import time
+import queue
+import threading
+
+STATUS_INTERVAL = 2.0       # siklus evaluasi status (detik)
+STATS_INTERVAL = 5.0        # sama dengan interval SystemStatsSampler
+HEARTBEAT_INTERVAL = 15.0
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class StatusBroadcaster:
+    def __init__(self, services_provider, status_provider, stats_provider,
+                 status_interval=STATUS_INTERVAL, stats_interval=STATS_INTERVAL):
+        """
+        Args:
+            services_provider: fungsi() -> list service dari registry aktif
+            status_provider: fungsi(services) -> {service_id: status}
+            stats_provider: fungsi() -> sample system stats terbaru
+        """
+        self.services_provider = services_provider
+        self.status_provider = status_provider
+        self.stats_provider = stats_provider
+        self.status_interval = status_interval
+        self.stats_interval = stats_interval
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._subscribers = set()
+        self._statuses = None       # snapshot terakhir {service_id: status}
+        self._stats = None
+        self._thread = None
+        self._dirty = False
+
+    # --- SUBSCRIBERS ---
+
+    def subscribe(self):
+        """Queue event untuk satu client; evaluator dimulai jika belum berjalan."""
+        q = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.add(q)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='status-events', daemon=True)
+                self._thread.start()
+            self._wake.notify()
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers.discard(q)
+
+    def snapshot(self):
+        """Snapshot terakhir untuk client yang baru terhubung (None jika belum ada)."""
+        with self._lock:
+            return self._statuses, self._stats
+
+    def notify(self, event=None):
+        """Bangunkan evaluator sekarang (dipasang sebagai listener supervisor)."""
+        with self._lock:
+            self._dirty = True
+            self._wake.notify()
+
+    def _publish(self, event, data):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for q in subscribers:
+            try:
+                q.put_nowait((event, data))
+            except queue.Full:
+                # Client terlalu lambat: putuskan, browser akan reconnect dan dapat snapshot baru
+                self.unsubscribe(q)
+                try:
+                    q.get_nowait()
+                    q.put_nowait(('reset', None))
+                except (queue.Empty, queue.Full):
+                    pass
+
+    # --- EVALUATOR ---
+
+    def _run(self):
+        next_stats = 0.0
+        while True:
+            with self._lock:
+                while not self._subscribers:
+                    # Tidak ada dashboard terbuka: snapshot dibuang agar tidak basi
+                    self._statuses = self._stats = None
+                    self._wake.wait()
+                self._dirty = False
+
+            try:
+                self._evaluate_statuses()
+            except Exception as e:
+                print(f"[StatusEvents] Status evaluation failed: {e}")
+
+            now = time.monotonic()
+            if now >= next_stats:
+                next_stats = now + self.stats_interval
+                try:
+                    stats = self.stats_provider()
+                    with self._lock:
+                        self._stats = stats
+                    self._publish('stats', stats)
+                except Exception as e:
+                    print(f"[StatusEvents] Stats sampling failed: {e}")
+
+            with self._lock:
+                if not self._dirty:
+                    self._wake.wait(min(self.status_interval, max(next_stats - time.monotonic(), 0)))
+
+    def _evaluate_statuses(self):
+        services = self.services_provider()
+        statuses = self.status_provider(services)
+        with self._lock:
+            previous = self._statuses
+            self._statuses = statuses
+        if previous is None or previous.keys() != statuses.keys():
+            # Registry / environment berubah: kirim ulang seluruh snapshot
+            self._publish('snapshot', statuses)
+            return
+        changes = {sid: status for sid, status in statuses.items() if previous.get(sid) != status}
+        if changes:
+            self._publish('status', changes)
+
+
+def sse_stream(broadcaster, heartbeat=HEARTBEAT_INTERVAL):
+    """
+    Generator SSE untuk satu client: snapshot awal, lalu event perubahan.
+    Komentar keep-alive dikirim setiap `heartbeat` detik (juga mendeteksi disconnect).
+    """
+    q = broadcaster.subscribe()
+    try:
+        statuses, stats = broadcaster.snapshot()
+        if statuses is not None:
+            yield f"event: snapshot\ndata: {json.dumps(statuses)}\n\n"
+        if stats is not None:
+            yield f"event: stats\ndata: {json.dumps(stats)}\n\n"
+        while True:
+            try:
+                event, data = q.get(timeout=heartbeat)
+            except queue.Empty:
+                yield ": keep-alive\n\n"
+                continue
+            if event == 'reset':
+                return
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    finally:
+        broadcaster.unsubscribe(q)
@@ -0,0 +1,101 @@
+"""
+system_stats.py — Sampler statistik sistem untuk KieroOPS
+Background thread mengambil sample CPU, memory, disk, dan network setiap
+interval tetap ke ring buffer. Request dashboard cukup membaca sample terakhir
+(tanpa psutil.cpu_percent(interval=1) yang memblokir 1 detik).
+"""
+
+import time
+import threading
+from collections import deque
+
+import psutil
+
+PRIMING_CPU_INTERVAL = 0.1    # detik, hanya untuk sample pertama
+
+
+class SystemStatsSampler:
+    def __init__(self, interval=5.0, history_seconds=3600, disk_path='/'):
+        self.interval = interval
+        self.disk_path = disk_path
+        self._history = deque(maxlen=max(1, int(history_seconds / interval)))
+        self._lock = threading.Lock()
+        self._thread = None
+        self._last_net = None
+
+    def start(self):
+        """Start sampler thread (sekali saja, aman dipanggil berulang)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            # Panggilan pertama cpu_percent(None) hanya menyiapkan baseline
+            psutil.cpu_percent(interval=None)
+            self._thread = threading.Thread(target=self._run, name='system-stats', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            # Tidur dulu: cpu_percent(None) tepat setelah baseline selalu 0.0
+            time.sleep(self.interval)
+            try:
+                self._sample()
+            except Exception as e:
+                print(f"[SystemStats] Sampling failed: {e}")
+
+    def _sample(self, cpu_interval=None):
+        cpu_percent = psutil.cpu_percent(interval=cpu_interval)
+        now = time.time()
+        net = psutil.net_io_counters()
+        sent_rate = recv_rate = 0.0
+        with self._lock:
+            if self._last_net:
+                last_time, last_net = self._last_net
+                elapsed = max(now - last_time, 1e-6)
+                sent_rate = max(net.bytes_sent - last_net.bytes_sent, 0) / elapsed
+                recv_rate = max(net.bytes_recv - last_net.bytes_recv, 0) / elapsed
+            self._last_net = (now, net)
+
+        sample = {
+            'timestamp': now,
+            'cpu_percent': cpu_percent,
+            'memory': psutil.virtual_memory()._asdict(),
+            'disk': psutil.disk_usage(self.disk_path)._asdict(),
+            'network': {
+                'bytes_sent': net.bytes_sent,
+                'bytes_recv': net.bytes_recv,
+                'sent_per_sec': round(sent_rate, 1),
+                'recv_per_sec': round(recv_rate, 1)
+            }
+        }
+        with self._lock:
+            self._history.append(sample)
+        return sample
+
+    def latest(self):
+        """
+        Sample terakhir. Sebelum sample pertama sampler tersedia, ambil satu
+        sample priming (memblokir PRIMING_CPU_INTERVAL) agar CPU tidak 0.0.
+        """
+        self.start()
+        with self._lock:
+            if self._history:
+                return self._history[-1]
+        return self._sample(cpu_interval=PRIMING_CPU_INTERVAL)
+
+    def history(self, seconds=3600):
+        """Riwayat ringkas untuk sparkline: [{t, cpu, mem, disk, net_sent, net_recv}, ...]."""
+        self.start()
+        cutoff = time.time() - seconds
+        with self._lock:
+            samples = [s for s in self._history if s['timestamp'] >= cutoff]
+        return [{
+            't': round(s['timestamp'], 1),
+            'cpu': s['cpu_percent'],
+            'mem': s['memory']['percent'],
+            'disk': s['disk']['percent'],
+            'net_sent': s['network']['sent_per_sec'],
+            'net_recv': s['network']['recv_per_sec']
+        } for s in samples]
+
+
+system_stats = SystemStatsSampler()
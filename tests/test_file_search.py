@@ -0,0 +1,38 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from file_search import search_content, search_filenames
+
+
+class SearchContentTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        with open(os.path.join(self.root, 'app.js'), 'w') as f:
+            f.write('const a = 1;\nconst value = "abbcde";\n')
+        with open(os.path.join(self.root, 'other.js'), 'w') as f:
+            f.write('nothing here\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_quantified_pattern_matches(self):
+        for pattern in (r'ab{1,3}cde', r'ab{0,3}cde', r'ab+cde'):
+            result = search_content(self.root, pattern)
+            self.assertEqual([(m['path'], m['line']) for m in result['matches']], [('app.js', 2)], pattern)
+
+    def test_literal_prefilter_still_excludes_files(self):
+        result = search_content(self.root, r'const \w+')
+        self.assertEqual({m['path'] for m in result['matches']}, {'app.js'})
+        # other.js tidak memuat literal "const " -> dilewati sebelum decode/regex
+        self.assertEqual(result['files_scanned'], 2)
+        self.assertEqual(result['files_prefiltered'], 1)
+
+    def test_filename_search(self):
+        result = search_filenames(self.root, 'app')
+        self.assertEqual(result['matches'][0]['path'], 'app.js')
+
+
+if __name__ == '__main__':
+    unittest.main()
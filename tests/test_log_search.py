@@ -0,0 +1,73 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from log_search import _index_cache, required_literals, search_logs
+
+
+class RequiredLiteralsTest(unittest.TestCase):
+    def test_plain_literal(self):
+        self.assertEqual(required_literals('timeout error'), ['timeout error'])
+
+    def test_optional_char_is_dropped(self):
+        self.assertEqual(required_literals('abcd?ef'), ['abc'])
+        self.assertEqual(required_literals('abcd*ef'), ['abc'])
+
+    def test_brace_quantifier_body_is_not_literal(self):
+        self.assertEqual(required_literals('ab{0,3}cde'), ['cde'])
+        self.assertEqual(required_literals('ab{1,3}cde'), ['cde'])
+        self.assertEqual(required_literals('abc{2}def'), ['abc', 'def'])
+        self.assertEqual(required_literals('xyz{,2}qqq'), ['qqq'])
+        self.assertEqual(required_literals('abc{2,}?def'), ['abc', 'def'])
+
+    def test_literal_brace_is_kept(self):
+        self.assertEqual(required_literals('abc{def'), ['abc{def'])
+
+    def test_alternation_disables_prefilter(self):
+        self.assertEqual(required_literals('foo|bar'), [])
+
+
+class SearchLogsQuantifierTest(unittest.TestCase):
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        with open(os.path.join(self.log_dir, '2024-01-01.log'), 'w') as f:
+            f.write('2024-01-01 10:00:00 start\n')
+            f.write('2024-01-01 10:00:01 value abbcde found\n')
+            f.write('2024-01-01 10:00:02 done\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.log_dir)
+
+    def test_quantified_pattern_is_not_skipped_by_prefilter(self):
+        for pattern in (r'ab{1,3}cde', r'ab{0,3}cde', r'ab+cde'):
+            result = search_logs(self.log_dir, pattern)
+            self.assertEqual(len(result['matches']), 1, pattern)
+            self.assertEqual(result['blocks_skipped'], 0, pattern)
+
+
+class IndexCleanupTest(unittest.TestCase):
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        for day in ('2024-01-01', '2024-01-02'):
+            with open(os.path.join(self.log_dir, f'{day}.log'), 'w') as f:
+                f.write(f'{day} 10:00:00 hello\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.log_dir)
+
+    def test_index_of_removed_file_is_dropped(self):
+        search_logs(self.log_dir, 'hello')
+        index_dir = os.path.join(self.log_dir, '.index')
+        self.assertEqual(len(os.listdir(index_dir)), 2)
+
+        removed = os.path.join(self.log_dir, '2024-01-01.log')
+        os.remove(removed)
+        result = search_logs(self.log_dir, 'hello')
+        self.assertEqual(len(result['matches']), 1)
+        self.assertEqual(os.listdir(index_dir), ['2024-01-02.log.json'])
+        self.assertNotIn(removed, _index_cache)
+
+
+if __name__ == '__main__':
+    unittest.main()